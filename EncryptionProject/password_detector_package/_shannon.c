@@ -0,0 +1,105 @@
+/* EncryptionProject/password_detector_package/_shannon.c */
+
+/*
+ * Optional C implementation of the entropy statistics kernel.
+ *
+ * shannon_stats(data) -> (entropy, skew, null_byte_ratio, ascii_ratio, high_byte_ratio)
+ *
+ * Produces the same values as entropy_kernel._entropy_stats_numpy; the
+ * package falls back to Numba, NumPy or pure Python when this module is
+ * not built.
+ */
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <math.h>
+#include <stdint.h>
+
+static PyObject *
+shannon_stats(PyObject *self, PyObject *args)
+{
+    Py_buffer view;
+    if (!PyArg_ParseTuple(args, "y*:shannon_stats", &view))
+        return NULL;
+
+    const unsigned char *buf = (const unsigned char *)view.buf;
+    Py_ssize_t n = view.len;
+    if (n <= 0) {
+        PyBuffer_Release(&view);
+        PyErr_SetString(PyExc_ValueError, "shannon_stats() requires a non-empty buffer");
+        return NULL;
+    }
+
+    /* Four interleaved histograms keep consecutive equal bytes from serializing on one counter */
+    uint32_t h0[256] = {0}, h1[256] = {0}, h2[256] = {0}, h3[256] = {0};
+    Py_ssize_t i = 0;
+
+    Py_BEGIN_ALLOW_THREADS
+    for (; i + 4 <= n; i += 4) {
+        h0[buf[i]]++;
+        h1[buf[i + 1]]++;
+        h2[buf[i + 2]]++;
+        h3[buf[i + 3]]++;
+    }
+    for (; i < n; i++)
+        h0[buf[i]]++;
+    Py_END_ALLOW_THREADS
+
+    PyBuffer_Release(&view);
+
+    double counts[256];
+    for (i = 0; i < 256; i++)
+        counts[i] = (double)h0[i] + h1[i] + h2[i] + h3[i];
+
+    const double total = (double)n;
+    const double mean = total / 256.0;
+    double entropy = 0.0, var = 0.0;
+    for (i = 0; i < 256; i++) {
+        double c = counts[i];
+        if (c > 0.0) {
+            double p = c / total;
+            entropy -= p * log2(p);
+        }
+        double d = c - mean;
+        var += d * d;
+    }
+    var /= 256.0;
+
+    /* Avoid division by zero if var is 0 (e.g. all bytes are same) */
+    const double sd = sqrt(var) + 1e-8;
+    double skew = 0.0;
+    for (i = 0; i < 256; i++) {
+        double z = (counts[i] - mean) / sd;
+        skew += z * z * z;
+    }
+    skew /= 256.0;
+
+    double ascii_count = 0.0, high_count = 0.0;
+    for (i = 32; i < 127; i++)
+        ascii_count += counts[i];
+    for (i = 128; i < 256; i++)
+        high_count += counts[i];
+
+    return Py_BuildValue("(ddddd)", entropy, skew, counts[0] / total,
+                         ascii_count / total, high_count / total);
+}
+
+static PyMethodDef shannon_methods[] = {
+    {"shannon_stats", shannon_stats, METH_VARARGS,
+     "shannon_stats(data) -> (entropy, skew, null_byte_ratio, ascii_ratio, high_byte_ratio)"},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef shannon_module = {
+    PyModuleDef_HEAD_INIT,
+    "_shannon",
+    "C implementation of the entropy statistics kernel.",
+    -1,
+    shannon_methods
+};
+
+PyMODINIT_FUNC
+PyInit__shannon(void)
+{
+    return PyModule_Create(&shannon_module);
+}
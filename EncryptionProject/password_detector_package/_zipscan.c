@@ -0,0 +1,81 @@
+/* EncryptionProject/password_detector_package/_zipscan.c */
+
+/*
+ * Optional C implementation of the ZIP central directory flag walk.
+ *
+ * encryption_flag(cd) -> True | False | None
+ *
+ * Same result as the pure-Python loop in zip_fast.zip_encryption_flag:
+ * True on the first entry with general purpose bit 0 set, False if no
+ * entry has it, None if a header is truncated or its signature is wrong.
+ * The package uses the Python loop when this module is not built.
+ */
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <stdint.h>
+
+#define CDH_SIZE 46
+
+/* Little-endian reads byte by byte: headers are not aligned and the host may be big-endian */
+static inline unsigned int
+read_u16(const unsigned char *p)
+{
+    return (unsigned int)p[0] | ((unsigned int)p[1] << 8);
+}
+
+static PyObject *
+encryption_flag(PyObject *self, PyObject *arg)
+{
+    Py_buffer view;
+    if (PyObject_GetBuffer(arg, &view, PyBUF_SIMPLE) < 0)
+        return NULL;
+
+    const unsigned char *cd = (const unsigned char *)view.buf;
+    const Py_ssize_t end = view.len;
+    Py_ssize_t pos = 0;
+    int result = 0; /* 1 encrypted, 0 none, -1 malformed */
+
+    Py_BEGIN_ALLOW_THREADS
+    while (pos < end) {
+        const unsigned char *h = cd + pos;
+        if (end - pos < CDH_SIZE || h[0] != 'P' || h[1] != 'K' || h[2] != 1 || h[3] != 2) {
+            result = -1;
+            break;
+        }
+        if (read_u16(h + 8) & 0x1) {
+            result = 1;
+            break;
+        }
+        pos += CDH_SIZE + (Py_ssize_t)read_u16(h + 28) + read_u16(h + 30) + read_u16(h + 32);
+    }
+    Py_END_ALLOW_THREADS
+
+    PyBuffer_Release(&view);
+
+    if (result < 0)
+        Py_RETURN_NONE;
+    if (result)
+        Py_RETURN_TRUE;
+    Py_RETURN_FALSE;
+}
+
+static PyMethodDef zipscan_methods[] = {
+    {"encryption_flag", encryption_flag, METH_O,
+     "encryption_flag(cd) -> True if any central directory entry is encrypted, False if none, None if malformed"},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef zipscan_module = {
+    PyModuleDef_HEAD_INIT,
+    "_zipscan",
+    "C implementation of the ZIP central directory flag walk.",
+    -1,
+    zipscan_methods
+};
+
+PyMODINIT_FUNC
+PyInit__zipscan(void)
+{
+    return PyModule_Create(&zipscan_module);
+}
@@ -0,0 +1,60 @@
+# EncryptionProject/password_detector_package/cache_utils.py #
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class LRUCache:
+    """Small thread-safe least-recently-used mapping with a fixed capacity."""
+
+    def __init__(self, maxsize: int = 4096):
+        """Initialize an empty cache holding at most `maxsize` entries."""
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for `key` (marking it recently used) or `default`."""
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+                return self._data[key]
+            except KeyError:
+                return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store `value` under `key`, evicting the least recently used entry when full."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def stat_key(file_path: str, st: Optional[os.stat_result] = None) -> Tuple:
+    """
+    Build a cache key that changes whenever the file's content may have changed.
+
+    Args:
+        file_path (str): Path to the file.
+        st (Optional[os.stat_result]): Stat result if already known.
+
+    Returns:
+        Tuple: (st_dev, st_ino, st_size, st_mtime_ns), or a path-based key
+               when the platform reports no inode number (e.g. DirEntry on Windows).
+    """
+    if st is None:
+        st = os.stat(file_path)
+    if st.st_ino:
+        return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+    return (os.path.abspath(file_path), st.st_size, st.st_mtime_ns)
@@ -0,0 +1,147 @@
+# EncryptionProject/password_detector_package/cfbf_fast.py #
+
+import os
+import struct
+from contextvars import ContextVar
+from typing import BinaryIO, Dict, List, Optional, Union
+
+# Minimal Compound File (OLE/CFBF) directory reader. The encryption checks only ask #
+# which streams and storages sit at the root (EncryptionInfo, EncryptedSummary, ...), #
+# so this follows the directory's FAT chain and walks the root's red-black tree #
+# instead of letting olefile load the whole FAT, mini FAT and directory #
+
+_SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+_HEADER = struct.Struct('<8s16s5H6s9L')  # Fields up to the first DIFAT entry (76 bytes) #
+_HEADER_SIZE = 512
+_HEADER_DIFAT = 109                      # FAT sector numbers stored in the header itself #
+_ENTRY_SIZE = 128
+_ENTRY_LINKS = struct.Struct('<HBB3L')   # Name length, type, color, left, right, child at 0x40 #
+_NOSTREAM = 0xFFFFFFFF
+_MAX_SECT = 0xFFFFFFFA                   # Sector numbers above this are markers (end of chain, free) #
+_ROOT, _STORAGE, _STREAM = 5, 1, 2
+# Directories larger than this many sectors are left to olefile #
+_MAX_DIR_SECTORS = 4096
+
+Source = Union[str, os.PathLike, BinaryIO]
+
+# Per-analysis memo of root_entry_names() by path. The detector sets a fresh dict for each #
+# file, so type detection and the OLE handler share one directory read; asyncio.to_thread #
+# copies the context, so worker threads see the same dict. The annotation is a string #
+# because ContextVar is only subscriptable from Python 3.9 #
+ole_cache: 'ContextVar[Optional[Dict[str, Optional[frozenset]]]]' = ContextVar('ole_cache', default=None)
+
+
+def root_entry_names(source: Source) -> Optional[frozenset]:
+    """
+    List the streams and storages directly under the root of a compound file.
+
+    Args:
+        source (Source): Path to the file or an open binary file object.
+
+    Returns:
+        Optional[frozenset]: Lowercased entry names (olefile matches names case-insensitively),
+                             or None if the file is not a readable compound file.
+    """
+    try:
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f:
+                return _root_entry_names(f)
+        return _root_entry_names(source)
+    except (OSError, ValueError, IndexError, struct.error, UnicodeDecodeError):
+        return None
+
+
+def cached_root_entry_names(path: str) -> Optional[frozenset]:
+    """
+    root_entry_names() for a path, memoized in ole_cache while an analysis has one set.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        Optional[frozenset]: Same as root_entry_names(path).
+    """
+    cache = ole_cache.get()
+    if cache is None:
+        return root_entry_names(path)
+    try:
+        return cache[path]
+    except KeyError:
+        names = cache[path] = root_entry_names(path)
+        return names
+
+
+def _root_entry_names(f: BinaryIO) -> Optional[frozenset]:
+    f.seek(0)
+    header = f.read(_HEADER_SIZE)
+    if len(header) != _HEADER_SIZE or not header.startswith(_SIGNATURE):
+        return None
+    (_, _, _, _, byte_order, sector_shift, _, _, _, num_fat, first_dir,
+     _, _, _, _, first_difat, num_difat) = _HEADER.unpack_from(header)
+    if byte_order != 0xFFFE or sector_shift not in (9, 12):
+        return None
+    sector_size = 1 << sector_shift
+    per_sector = sector_size // 4
+
+    difat: List[int] = list(struct.unpack_from(f'<{_HEADER_DIFAT}L', header, _HEADER.size))
+    difat_next, difat_left = first_difat, num_difat
+    fat_cache: Dict[int, tuple] = {}
+
+    def read_sector(sector: int) -> bytes:
+        f.seek((sector + 1) << sector_shift)
+        data = f.read(sector_size)
+        if len(data) != sector_size:
+            raise ValueError('Truncated sector')
+        return data
+
+    def next_sector(sector: int) -> int:
+        nonlocal difat_next, difat_left
+        index = sector // per_sector
+        # DIFAT sectors past the header are only read when a chain reaches that far #
+        while index >= len(difat) and difat_left and difat_next <= _MAX_SECT:
+            entries = struct.unpack(f'<{per_sector}L', read_sector(difat_next))
+            difat.extend(entries[:-1])
+            difat_next = entries[-1]
+            difat_left -= 1
+        if index >= min(len(difat), num_fat):
+            raise ValueError('Sector outside the FAT')
+        fat = fat_cache.get(index)
+        if fat is None:
+            fat = fat_cache[index] = struct.unpack(f'<{per_sector}L', read_sector(difat[index]))
+        return fat[sector % per_sector]
+
+    chunks = []
+    sector = first_dir
+    while sector <= _MAX_SECT:
+        if len(chunks) >= _MAX_DIR_SECTORS:
+            return None
+        chunks.append(read_sector(sector))
+        sector = next_sector(sector)
+    directory = b''.join(chunks)
+
+    def entry(sid: int) -> tuple:
+        offset = sid * _ENTRY_SIZE
+        if offset + _ENTRY_SIZE > len(directory):
+            raise ValueError('Directory entry out of range')
+        return _ENTRY_LINKS.unpack_from(directory, offset + 0x40)
+
+    name_len, entry_type, _, _, _, child = entry(0)
+    if entry_type != _ROOT:
+        return None
+
+    # The root's children form a tree linked through left/right sibling ids #
+    names = set()
+    stack = [child]
+    seen = set()
+    while stack:
+        sid = stack.pop()
+        if sid == _NOSTREAM or sid in seen:
+            continue
+        seen.add(sid)
+        name_len, entry_type, _, left, right, _ = entry(sid)
+        if entry_type in (_STORAGE, _STREAM) and 2 <= name_len <= 64:
+            offset = sid * _ENTRY_SIZE
+            names.add(directory[offset:offset + name_len - 2].decode('utf-16-le').lower())
+        stack.append(left)
+        stack.append(right)
+    return frozenset(names)
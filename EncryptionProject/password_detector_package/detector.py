@@ -1,52 +1,153 @@
 # EncryptionProject/password_detector_package/detector.py #
 
+import io
 import os
+import stat
 import time  
 import asyncio
-from typing import List, Dict
-from .entropy import EntropyAnalyzer
+import hashlib
+import threading
+from typing import List, Dict, Iterator, AsyncIterator, Optional, Tuple, Union
+from .entropy import (
+    EntropyAnalyzer, SAMPLE_SIZE, SPREAD_SAMPLE_MIN_SIZE, ENC_EXT, LIKELY_PLAINTEXT_EXT, read_sample,
+    _sample_spans
+)
 from .type_utils import FileTypeDetector
-from concurrent.futures import ThreadPoolExecutor
+from .cache_utils import LRUCache, stat_key
+from .result_cache import ResultStore
+from .cfbf_fast import ole_cache
+from .prefetcher import aprefetch
+from concurrent.futures import Executor, ThreadPoolExecutor
 from .file_handlers import (
     OfficeOpenXMLHandler, OfficeLegacyHandler, PDFHandler, ZIPHandler,
     RARHandler, SevenZipHandler, SQLiteHandler, PSTHandler, MSGHandler,
-    LibreOfficeHandler
+    LibreOfficeHandler, CPU_BOUND_CHECKS, BlockingDispatcher, handler_dispatcher, _unavailable
 )
 
 
+# Files at least this large are deduplicated by size, extension and a hash of the first #
+# 4 KiB, the entropy sample spans and the last 4 KiB, where ZIP central directories, PDF #
+# trailers and 7z headers sit. Copies that differ only elsewhere are classified alike #
+DEDUP_MIN_SIZE = 1 << 20
+DEDUP_HEAD_SIZE = 4096
+DEDUP_TAIL_SIZE = 4096
+
+# No encrypted container format fits in fewer bytes (an empty ZIP alone is 22), and #
+# entropy over so few bytes carries no signal, so smaller files are never opened #
+MIN_CONTAINER_SIZE = 16
+
+# Handlers whose is_encrypted accepts the already-read prefix as `header` (and `fp`) #
+_HEADER_AWARE_TYPES = frozenset({'office_openxml', 'pdf', 'zip', 'sqlite', 'libre_office'})
+
+# One FileTypeDetector (and so one loaded Magika model and one type cache) per process #
+_TYPE_DETECTOR: Optional[FileTypeDetector] = None
+_TD_LOCK = threading.Lock()
+
+
+def _get_type_detector() -> FileTypeDetector:
+    """Return the process-wide FileTypeDetector, creating it on first use."""
+    global _TYPE_DETECTOR
+    if _TYPE_DETECTOR is None:
+        with _TD_LOCK:
+            if _TYPE_DETECTOR is None:
+                _TYPE_DETECTOR = FileTypeDetector()
+    return _TYPE_DETECTOR
+
+
 class PasswordProtectionDetector:
     """Detects password protection and encryption in files using format-specific handlers and entropy analysis."""
 
-    def __init__(self, executor: ThreadPoolExecutor):
-        """Initialize with a file type detector and handlers for supported formats."""
-        self.type_detector = FileTypeDetector()
+    def __init__(self, executor: ThreadPoolExecutor, max_workers: int = 32,
+                 cpu_executor: Optional[Executor] = None, result_cache_size: int = 65536,
+                 result_store: Optional[ResultStore] = None):
+        """
+        Initialize with the shared file type detector and handlers for supported formats.
+
+        Args:
+            executor (ThreadPoolExecutor): Shared executor for blocking work.
+            max_workers (int): Maximum number of files analyzed concurrently by scan_directory,
+                and of threads running the format handlers' blocking checks (also capped at
+                the executor's size).
+            cpu_executor (Optional[Executor]): Executor for CPU-bound work, typically a
+                ProcessPoolExecutor so entropy scoring and the PDF/7z checks run in parallel
+                across cores instead of serializing on the GIL. When None, scoring runs
+                inline and every handler runs on the thread pool.
+            result_cache_size (int): Maximum number of analysis results remembered per
+                unchanged file (same device, inode, size and mtime), and per distinct
+                large-file content.
+            result_store (Optional[ResultStore]): On-disk memo consulted when the in-memory
+                cache misses, so verdicts survive across runs. The caller owns and closes it.
+        """
+        self.type_detector = _get_type_detector()
+        # Bound coroutine functions, resolved once, so dispatch is a single dict lookup #
         self.handlers = {
-            'office_openxml': OfficeOpenXMLHandler,
-            'office_legacy': OfficeLegacyHandler,
-            'pdf': PDFHandler,
-            'zip': ZIPHandler,
-            'rar': RARHandler,
-            '7z': SevenZipHandler,
-            'sqlite': SQLiteHandler,
-            'pst': PSTHandler,
-            'msg': MSGHandler,
-            'libre_office': LibreOfficeHandler
+            'office_openxml': OfficeOpenXMLHandler.is_encrypted,
+            'office_legacy': OfficeLegacyHandler.is_encrypted,
+            'pdf': PDFHandler.is_encrypted,
+            'zip': ZIPHandler.is_encrypted,
+            'rar': RARHandler.is_encrypted,
+            '7z': SevenZipHandler.is_encrypted,
+            'sqlite': SQLiteHandler.is_encrypted,
+            'pst': PSTHandler.is_encrypted,
+            'msg': MSGHandler.is_encrypted,
+            'libre_office': LibreOfficeHandler.is_encrypted
         }
-        self.executor = executor # Store the executor #
+        self.executor = executor # Store the executor; None means the loop's default #
+        self.max_workers = max_workers
+        # Handler checks run on this detector's own threads, never more than max_workers #
+        # nor than the executor it was given; close() joins them #
+        self._dispatcher = BlockingDispatcher(min(max_workers, getattr(executor, '_max_workers', max_workers)))
+        self.cpu_executor = cpu_executor
+        # With a CPU executor, GIL-heavy parsers (PDF, 7z) run in its worker processes #
+        self._cpu_checks = CPU_BOUND_CHECKS if cpu_executor is not None else {}
+        self._entropy = _EntropyBatcher(cpu_executor)
+        self._results = LRUCache(maxsize=result_cache_size)
+        self._by_content = LRUCache(maxsize=result_cache_size)
+        self._store = result_store
+
+    def close(self) -> None:
+        """Let in-flight handler checks finish and join the detector's handler threads."""
+        self._dispatcher.shutdown()
+
+    def __enter__(self) -> 'PasswordProtectionDetector':
+        return self
 
-    async def analyze_file(self, file_path: str) -> Dict:
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    async def analyze_file(self, file_path: Union[str, os.DirEntry],
+                           st: Optional[os.stat_result] = None) -> Dict:
         """
         Analyze a file for password protection and encryption.
         
         Args:
-            file_path (str): Path to the file.
+            file_path (Union[str, os.DirEntry]): Path to the file, or an os.scandir() entry
+                whose cached stat result is used instead of stat'ing the path again.
+            st (Optional[os.stat_result]): Stat result already known for the file
+                (e.g. from os.DirEntry.stat()); skips the redundant stat calls.
         
         Returns:
             Dict: Results with keys 'password_protected', 'encrypted', 'confidence', and 'duration'.
         """
         start_time = time.perf_counter()
+
+        if isinstance(file_path, os.DirEntry):
+            if st is None:
+                try:
+                    st = file_path.stat()
+                except OSError:
+                    pass
+            file_path = file_path.path
         
-        if not os.path.isfile(file_path) or os.path.getsize(file_path) == 0:
+        if st is None:
+            # One stat answers isfile/getsize and also keys the caches below #
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                pass
+        is_empty = st is None or not stat.S_ISREG(st.st_mode) or st.st_size == 0
+
+        if is_empty:
             end_time = time.perf_counter()
             return {
                 'file': file_path,
@@ -56,35 +157,173 @@ class PasswordProtectionDetector:
                 'duration': end_time - start_time  
             }
 
-        file_type = await self.type_detector.detect(file_path)
+        # Encrypted-container extensions are conclusive on their own; skip all I/O #
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext in ENC_EXT:
+            end_time = time.perf_counter()
+            return {
+                'file': file_path,
+                'password_protected': False,
+                'encrypted': True,
+                'confidence': 1.0,
+                'duration': end_time - start_time
+            }
+
+        if st.st_size < MIN_CONTAINER_SIZE:
+            end_time = time.perf_counter()
+            return {
+                'file': file_path,
+                'password_protected': False,
+                'encrypted': False,
+                'confidence': 1.0,
+                'duration': end_time - start_time
+            }
+
+        # Files unchanged since an earlier analysis (e.g. on a re-scan) cost one lookup. The #
+        # extension is part of the key: a rename keeps the inode and mtime but not the verdict #
+        key = (*stat_key(file_path, st), ext)
+        cached = self._results.get(key)
+        if cached is None and self._store is not None:
+            # Previous runs' verdicts; promoted so a second lookup stays in memory #
+            cached = self._store.get(key)
+            if cached is not None:
+                self._results.put(key, cached)
+        if cached is not None:
+            password_protected, encrypted, confidence = cached
+            end_time = time.perf_counter()
+            return {
+                'file': file_path,
+                'password_protected': password_protected,
+                'encrypted': encrypted,
+                'confidence': confidence,
+                'duration': end_time - start_time
+            }
+
+        # One read feeds the sniffer, the entropy fallback and the duplicate-content key #
+        prefix = await asyncio.get_running_loop().run_in_executor(
+            self.executor, _read_prefix, file_path, SAMPLE_SIZE
+        )
+
+        if not prefix:
+            # Unreadable (permissions, locked, vanished): nothing to classify, and nothing #
+            # cached, since a permission change leaves the stat key as it was #
+            end_time = time.perf_counter()
+            return {
+                'file': file_path,
+                'password_protected': False,
+                'encrypted': False,
+                'confidence': 0.0,
+                'duration': end_time - start_time
+            }
+
+        # Large copies of the same content (backups, vendored trees) are classified once #
+        content_key = None
+        verdict = None
+        sample = None
+        if st.st_size >= DEDUP_MIN_SIZE:
+            # The spread entropy sample comes with the digest, so a miss does not re-read it #
+            digest, sample = await asyncio.get_running_loop().run_in_executor(
+                self.executor, _content_digest, file_path, st.st_size, prefix
+            )
+            if digest is not None:
+                content_key = (st.st_size, ext, digest)
+                verdict = self._by_content.get(content_key)
+
+        persist = True
+        if verdict is None:
+            # Type detection and the OLE handlers share one compound file directory read, #
+            # and the handlers find this detector's dispatcher #
+            token = ole_cache.set({})
+            dispatcher_token = handler_dispatcher.set(self._dispatcher)
+            try:
+                file_type, verdict = await self._classify(file_path, st, ext, prefix, sample)
+            finally:
+                handler_dispatcher.reset(dispatcher_token)
+                ole_cache.reset(token)
+            # A verdict reached without the format's library is not kept past this run, #
+            # or it would outlive installing the library #
+            persist = self.handlers.get(file_type) is not _unavailable
+            if content_key is not None and persist:
+                self._by_content.put(content_key, verdict)
+        self._results.put(key, verdict)
+        if self._store is not None and persist:
+            self._store.put(key, verdict)
+        password_protected, encrypted, confidence = verdict
+        end_time = time.perf_counter() 
+
+        return {
+            'file': file_path,
+            'password_protected': password_protected,
+            'encrypted': encrypted,
+            'confidence': confidence,
+            'duration': end_time - start_time  
+        }
+
+    async def _classify(self, file_path: str, st: os.stat_result, ext: str, prefix: bytes,
+                        sample: Optional[bytes] = None) -> Tuple[str, Tuple[bool, bool, float]]:
+        """
+        Run type detection, the format handler and, if still inconclusive, entropy scoring.
+
+        Args:
+            file_path (str): Path to the file.
+            st (os.stat_result): Stat result of the file.
+            ext (str): Lowercased file extension including the dot.
+            prefix (bytes): Leading bytes of the file already read by analyze_file.
+            sample (Optional[bytes]): Head/middle/tail entropy sample of a large file, if
+                analyze_file already read it.
+
+        Returns:
+            Tuple[str, Tuple[bool, bool, float]]: The detected file type and
+                (password_protected, encrypted, confidence)
+        """
+        # Known extensions whose signature matches settle without a cache round or coroutine #
+        file_type = self.type_detector.detect_fast(file_path, prefix)
+        if file_type is None:
+            file_type = await self.type_detector.detect(file_path, st, prefix)
 
         password_protected, encrypted, confidence = False, False, 0.0
         try:
-            if file_type in self.handlers:
-                handler = self.handlers[file_type]
-                password_protected, encrypted, confidence = await handler.is_encrypted(file_path)
+            cpu_check = self._cpu_checks.get(file_type)
+            if cpu_check is not None:
+                password_protected, encrypted, confidence = await asyncio.get_running_loop().run_in_executor(
+                    self.cpu_executor, cpu_check, file_path
+                )
+            else:
+                handler = self.handlers.get(file_type)
+                if handler is not None:
+                    if file_type in _HEADER_AWARE_TYPES:
+                        # Hand over the prefix already in memory instead of a re-read. A short #
+                        # prefix means the read hit EOF: the whole file is in memory and the #
+                        # handler parses it from there without opening the file again #
+                        fp = io.BytesIO(prefix) if len(prefix) < SAMPLE_SIZE else None
+                        password_protected, encrypted, confidence = await handler(file_path, fp=fp, header=prefix)
+                    else:
+                        password_protected, encrypted, confidence = await handler(file_path)
         except Exception as e:
             # To prevent UnicodeEncodeError in error message #
             safe_file_path = file_path.encode('utf-8', 'replace').decode('utf-8')
             print(f"Error analyzing {safe_file_path}: {str(e)}")
             confidence = 0.0
 
-        if confidence < 0.5:
-            # EntropyAnalyzer.analyze is blocking so we call it with to_thread #
-            encrypted_entropy, entropy_conf = await asyncio.to_thread(EntropyAnalyzer.analyze, file_path)
+        if confidence < 0.5 and ext in LIKELY_PLAINTEXT_EXT:
+            # A text file that no handler claimed is not worth an entropy pass #
+            encrypted = False
+            confidence = max(confidence, 0.9)
+        elif confidence < 0.5:
+            if not sample:
+                sample = prefix
+                if st.st_size >= SPREAD_SAMPLE_MIN_SIZE:
+                    # The head alone under-represents large files; sample head, middle and tail #
+                    sample = await asyncio.get_running_loop().run_in_executor(
+                        self.executor, read_sample, file_path, st.st_size
+                    )
+            # Samples from concurrent analyses are scored together in one batched pass #
+            encrypted_entropy, entropy_conf = await self._entropy.score(sample, ext)
             if entropy_conf > confidence:
                 encrypted = encrypted_entropy
                 confidence = entropy_conf
 
-        end_time = time.perf_counter() 
-
-        return {
-            'file': file_path,
-            'password_protected': password_protected,
-            'encrypted': encrypted,
-            'confidence': confidence,
-            'duration': end_time - start_time  
-        }
+        return file_type, (password_protected, encrypted, confidence)
 
     async def scan_directory(self, directory: str) -> List[Dict]:
         """
@@ -94,13 +333,209 @@ class PasswordProtectionDetector:
             directory (str): Path to the directory.
         
         Returns:
-            List[Dict]: List of analysis results for each file.
+            List[Dict]: List of analysis results for each file, in completion order.
         """
-        tasks = []
-        for root, _, files in os.walk(directory):
-            for file in files:
-                full_path = os.path.join(root, file)
-                tasks.append(self.analyze_file(full_path)) 
-        
-        results = await asyncio.gather(*tasks)
+        results = []
+        async for result in self.iter_directory(directory):
+            results.append(result)
         return results
+
+    async def iter_directory(self, directory: str) -> AsyncIterator[Dict]:
+        """
+        Analyze files as the directory walk produces them and yield results as they complete.
+
+        At most 2 * max_workers tasks exist at any moment, so memory stays constant
+        no matter how many files the tree contains, and the first results are
+        available long before a large scan finishes.
+
+        Args:
+            directory (str): Path to the directory.
+
+        Yields:
+            Dict: Analysis result for each file, in completion order.
+        """
+        # Created per scan so the semaphore always belongs to the running event loop #
+        sem = asyncio.BoundedSemaphore(self.max_workers)
+        max_in_flight = 2 * self.max_workers
+        in_flight = set()
+
+        # Names used once per file are bound locally to skip attribute lookups in the walk loop #
+        loop = asyncio.get_running_loop()
+        create_task = loop.create_task
+        guarded = self._guarded
+        wait = asyncio.wait
+        first_completed = asyncio.FIRST_COMPLETED
+
+        # The walk runs ahead on a background thread and has the kernel read upcoming files' #
+        # headers and trailers while earlier tasks are still being analyzed; a slow walk #
+        # only suspends this generator, never the loop #
+        walk = aprefetch(_iter_files(directory))
+        try:
+            async for file_path, st in walk:
+                in_flight.add(create_task(guarded(sem, file_path, st)))
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = await wait(in_flight, return_when=first_completed)
+                    for task in done:
+                        yield task.result()
+
+            while in_flight:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            # A consumer that stops early (closed pipe, break) leaves no task or walker behind #
+            await walk.aclose()
+            for task in in_flight:
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+    async def _guarded(self, sem: asyncio.BoundedSemaphore, file_path: str,
+                       st: Optional[os.stat_result] = None) -> Dict:
+        """Analyze a file while holding a slot of the scan's concurrency limit."""
+        async with sem:
+            return await self.analyze_file(file_path, st)
+
+
+class _EntropyBatcher:
+    """
+    Collects entropy samples submitted during one event-loop iteration and scores
+    them together with EntropyAnalyzer.analyze_many, inline or on the CPU executor.
+    """
+
+    def __init__(self, cpu_executor: Optional[Executor] = None):
+        self.cpu_executor = cpu_executor
+        self._pending = []
+
+    def score(self, data: bytes, ext: str) -> asyncio.Future:
+        """Queue a sample; the returned future resolves to (is_encrypted, confidence)."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self._pending:
+            loop.call_soon(self._flush, loop)
+        self._pending.append((data, ext, future))
+        return future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        batch, self._pending = self._pending, []
+        samples = [data for data, _, _ in batch]
+        exts = [ext for _, ext, _ in batch]
+
+        if self.cpu_executor is None:
+            try:
+                _resolve(batch, EntropyAnalyzer.analyze_many(samples, exts))
+            except Exception as e:
+                _resolve(batch, error=e)
+            return
+
+        def _finish(f: asyncio.Future) -> None:
+            # exception() raises on a cancelled future (executor shut down with cancel_futures) #
+            if f.cancelled():
+                for _, _, future in batch:
+                    future.cancel()
+            elif f.exception() is not None:
+                _resolve(batch, error=f.exception())
+            else:
+                _resolve(batch, f.result())
+
+        pending = loop.run_in_executor(self.cpu_executor, EntropyAnalyzer.analyze_many, samples, exts)
+        pending.add_done_callback(_finish)
+
+
+def _resolve(batch: List[Tuple], results: Optional[List] = None, error: Optional[BaseException] = None) -> None:
+    """Hand batched entropy results (or a shared error) back to the waiting analyses."""
+    for i, (_, _, future) in enumerate(batch):
+        if future.done():
+            continue
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(results[i])
+
+
+# O_BINARY only exists (and matters) on Windows #
+_PREFIX_OPEN_FLAGS = os.O_RDONLY | getattr(os, 'O_BINARY', 0)
+
+
+def _read_prefix(file_path: str, size: int) -> bytes:
+    """Read up to `size` leading bytes of a file, or b'' if it cannot be read."""
+    # Raw descriptor: open/read/close syscalls only, no file object, no BufferedReader copy #
+    try:
+        fd = os.open(file_path, _PREFIX_OPEN_FLAGS)
+    except OSError:
+        return b''
+    try:
+        chunks = []
+        remaining = size
+        while remaining > 0:
+            chunk = os.read(fd, remaining)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return chunks[0] if len(chunks) == 1 else b''.join(chunks)
+    except OSError:
+        return b''
+    finally:
+        os.close(fd)
+
+
+def _content_digest(file_path: str, st_size: int, prefix: bytes) -> Tuple[Optional[bytes], bytes]:
+    """
+    Hash the parts of a large file its verdict depends on, reading the entropy sample on the way.
+
+    Args:
+        file_path (str): Path to the file.
+        st_size (int): File size, which places the middle and tail spans.
+        prefix (bytes): Leading bytes already read by analyze_file.
+
+    Returns:
+        Tuple[Optional[bytes], bytes]: The digest and the read_sample() bytes, or
+            (None, b'') if the file cannot be read.
+    """
+    digest = hashlib.blake2b(prefix[:DEDUP_HEAD_SIZE], digest_size=16)
+    try:
+        with open(file_path, 'rb', buffering=0) as f:
+            chunks = []
+            for offset, length in _sample_spans(st_size, SAMPLE_SIZE):
+                f.seek(offset)
+                chunks.append(f.read(length))
+            f.seek(max(0, st_size - DEDUP_TAIL_SIZE))
+            tail = f.read(DEDUP_TAIL_SIZE)
+    except OSError:
+        return None, b''
+    sample = b''.join(chunks)
+    digest.update(sample)
+    digest.update(tail)
+    return digest.digest(), sample
+
+
+def _iter_files(directory: str) -> Iterator[Tuple[str, Optional[os.stat_result]]]:
+    """
+    Lazily yield (path, stat_result) for every file under a directory.
+
+    The stat result comes from os.DirEntry, which caches it, so analyze_file needs
+    no further stat calls. It is None when the entry cannot be stat'ed (e.g. a
+    broken symlink). Mirrors os.walk defaults: symlinked directories are not
+    followed and unreadable directories are skipped silently.
+    """
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if not is_dir:
+                        try:
+                            st = entry.stat()
+                        except OSError:
+                            st = None
+                        yield entry.path, st
+                    elif not entry.is_symlink():
+                        stack.append(entry.path)
+        except OSError:
+            continue
@@ -1,81 +1,159 @@
 # EncryptionProject/password_detector_package/entropy.py #
 
 import os
-import math
-from typing import Tuple
-from collections import Counter
+import threading
+from bisect import bisect_left
+from typing import List, Optional, Sequence, Tuple
+from .entropy_kernel import entropy_stats, entropy_stats_many
 
 # High-entropy file extensions (likely encrypted) #
 ENC_EXT = {'.gpg', '.enc', '.aes', '.crypt', '.pgp'}
+# Plain-text extensions whose content is never scored for entropy #
+LIKELY_PLAINTEXT_EXT = {
+    '.txt', '.log', '.md', '.html', '.htm', '.css', '.js', '.py',
+    '.json', '.xml', '.csv', '.c', '.h', '.cpp'
+}
 # Formats that naturally exhibit high entropy (e.g., compressed files) #
 HIGH_ENTROPY_FORMATS = {'.docx', '.xlsx', '.pptx', '.ods', '.odt', '.odp', '.odg', '.odf', '.odm'}
+# Entropy band edges and the score of each band: <= 7.2, (7.2, 7.5], (7.5, 7.8], > 7.8 #
+_ENTROPY_EDGES = (7.2, 7.5, 7.8)
+_ENTROPY_SCORES = (0.0, 0.3, 0.5, 0.7)
+# Default number of leading bytes sampled per file #
+SAMPLE_SIZE = 8192
+
+# Files at least this large are sampled at head, middle and tail instead of head only #
+SPREAD_SAMPLE_MIN_SIZE = 1 << 20
+
+# Per-thread scratch buffer reused by analyze() so sampling allocates nothing per file #
+_BUF = threading.local()
 
 
 class EntropyAnalyzer:
     """Analyzes file entropy and statistical features to detect encryption."""
 
     @staticmethod
-    def analyze(file_path: str, sample_size: int = 8192) -> Tuple[bool, float]:
+    def analyze(file_path: str, sample_size: int = SAMPLE_SIZE,
+                st_size: Optional[int] = None) -> Tuple[bool, float]:
         """
         Analyze file entropy and byte distribution to detect encryption.
         
         Args:
             file_path (str): File to analyze.
             sample_size (int): Bytes to sample (default: 8KB).
+            st_size (Optional[int]): File size if known; files of at least
+                SPREAD_SAMPLE_MIN_SIZE bytes are sampled at head, middle and tail.
         
         Returns:
             Tuple[bool, float]: (is_encrypted, confidence_score)
         """
+        buf = getattr(_BUF, 'buf', None)
+        if buf is None or len(buf) < sample_size:
+            buf = _BUF.buf = bytearray(sample_size)
+        view = memoryview(buf)[:sample_size]
+
         try:
-            with open(file_path, 'rb') as f:
-                data = f.read(sample_size)
+            # Unbuffered so the bytes land directly in the scratch buffer #
+            with open(file_path, 'rb', buffering=0) as f:
+                n = 0
+                for offset, length in _sample_spans(st_size, sample_size):
+                    f.seek(offset)
+                    end = n + length
+                    while n < end:
+                        read = f.readinto(view[n:end])
+                        if not read:
+                            break
+                        n += read
         except Exception:
             return False, 0.0
 
+        return EntropyAnalyzer.analyze_bytes(view[:n], os.path.splitext(file_path)[1].lower())
+
+    @staticmethod
+    def analyze_bytes(data: bytes, ext: str = '') -> Tuple[bool, float]:
+        """
+        Score an already-read sample, so callers that hold the file prefix skip a second read.
+        
+        Args:
+            data (bytes): Leading bytes of the file (any bytes-like object).
+            ext (str): Lowercased file extension including the dot (e.g. '.docx').
+        
+        Returns:
+            Tuple[bool, float]: (is_encrypted, confidence_score)
+        """
         if not data:
             return False, 0.0
 
-        counts = Counter(data)
-        # Avoid math.log2(0) by filtering out zero counts if any #
-        entropy = -sum((c / len(data)) * math.log2(c / len(data)) for c in counts.values() if c > 0)
-
-        freqs = [counts.get(i, 0) for i in range(256)]
-        mean = sum(freqs) / 256
-        var = sum((f - mean) ** 2 for f in freqs) / 256
-        # Avoid division by zero if var is 0 (e.g. all bytes are same) #
-        skew = sum(((f - mean) / (math.sqrt(var) + 1e-8)) ** 3 for f in freqs) / 256
-
-        null_byte_ratio = data.count(0x00) / len(data)
-        ascii_ratio = sum(32 <= b <= 126 for b in data) / len(data)
-        high_byte_ratio = sum(b > 127 for b in data) / len(data)
+        return _score(entropy_stats(data), ext)
 
-        score = 0.0
-        if entropy > 7.8:
-            score += 0.7
-        elif entropy > 7.5:
-            score += 0.5
-        elif entropy > 7.2:
-            score += 0.3
-
-        if abs(skew) < 0.3:
-            score += 0.2
-
-        if null_byte_ratio < 0.01:
-            score += 0.1
-
-        if ascii_ratio < 0.4:
-            score += 0.1
-
-        if high_byte_ratio > 0.3:
-            score += 0.1
-
-        ext = os.path.splitext(file_path)[1].lower()
-        if ext in HIGH_ENTROPY_FORMATS and entropy > 7.2:
-            score -= 0.2
-
-        if ext in ENC_EXT:
-            score += 0.2
-
-        is_encrypted = score > 0.7
-        confidence = min(1.0, max(0.0, score))
-        return is_encrypted, confidence
+    @staticmethod
+    def analyze_many(samples: Sequence[bytes], exts: Sequence[str]) -> List[Tuple[bool, float]]:
+        """
+        Score many already-read samples with one batched statistics pass.
+        
+        Args:
+            samples (Sequence[bytes]): Leading bytes of each file.
+            exts (Sequence[str]): Lowercased extension of each file, aligned with samples.
+        
+        Returns:
+            List[Tuple[bool, float]]: (is_encrypted, confidence_score) per sample.
+        """
+        results = [(False, 0.0)] * len(samples)
+        live = [i for i, data in enumerate(samples) if data]
+        stats = entropy_stats_many([samples[i] for i in live])
+        for i, row in zip(live, stats):
+            results[i] = _score(row, exts[i])
+        return results
+
+
+def read_sample(file_path: str, st_size: int, sample_size: int = SAMPLE_SIZE) -> bytes:
+    """
+    Read the bytes EntropyAnalyzer.analyze would sample from a file.
+
+    Args:
+        file_path (str): File to sample.
+        st_size (int): File size, which selects head-only or head/middle/tail sampling.
+        sample_size (int): Total bytes to sample (default: 8KB).
+
+    Returns:
+        bytes: The sample, or b'' if the file cannot be read.
+    """
+    try:
+        with open(file_path, 'rb', buffering=0) as f:
+            chunks = []
+            for offset, length in _sample_spans(st_size, sample_size):
+                f.seek(offset)
+                chunks.append(f.read(length))
+            return b''.join(chunks)
+    except OSError:
+        return b''
+
+
+def _sample_spans(st_size: Optional[int], sample_size: int) -> Tuple[Tuple[int, int], ...]:
+    """
+    (offset, length) ranges to sample. Large files get three equal slices so the
+    sample also covers trailers and payloads that sit far from the header.
+    """
+    if st_size is None or st_size < SPREAD_SAMPLE_MIN_SIZE:
+        return ((0, sample_size),)
+    third = sample_size // 3
+    last = sample_size - 2 * third
+    return ((0, third), (st_size // 2, third), (st_size - last, last))
+
+
+def _score(stats: Tuple[float, float, float, float, float], ext: str) -> Tuple[bool, float]:
+    """Turn byte statistics into (is_encrypted, confidence_score)."""
+    entropy, skew, null_byte_ratio, ascii_ratio, high_byte_ratio = stats
+    # Table-driven scoring: one bisect picks the entropy band, comparisons add as 0/1 #
+    score = (
+        _ENTROPY_SCORES[bisect_left(_ENTROPY_EDGES, entropy)]
+        + 0.2 * (abs(skew) < 0.3)
+        + 0.1 * (null_byte_ratio < 0.01)
+        + 0.1 * (ascii_ratio < 0.4)
+        + 0.1 * (high_byte_ratio > 0.3)
+    )
+    score -= 0.2 * (ext in HIGH_ENTROPY_FORMATS and entropy > 7.2)
+    score += 0.2 * (ext in ENC_EXT)
+
+    is_encrypted = score > 0.7
+    confidence = min(1.0, max(0.0, score))
+    return is_encrypted, confidence
@@ -0,0 +1,217 @@
+# EncryptionProject/password_detector_package/entropy_kernel.py #
+
+import math
+from typing import List, Sequence, Tuple
+from collections import Counter
+
+# --- Optional Dependency Checks --- #
+# The _shannon C extension (built by setup.py when a compiler is present) is preferred; #
+# Numba compiles the kernel to machine code; NumPy and then pure Python are the fallbacks #
+
+try:
+    from ._shannon import shannon_stats
+    SHANNON_AVAILABLE = True
+except ImportError:
+    SHANNON_AVAILABLE = False
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+# Numba only matters without the C kernel; importing it costs far more than the rest of the package #
+NUMBA_AVAILABLE = False
+if NUMPY_AVAILABLE and not SHANNON_AVAILABLE:
+    try:
+        from numba import njit
+        NUMBA_AVAILABLE = True
+    except ImportError:
+        pass
+
+# Byte classification tables so ratio counting stays inside bytes.translate/bytes.count #
+_ASCII_TABLE = bytes(1 if 32 <= i <= 126 else 0 for i in range(256))
+_HIGH_TABLE = bytes(1 if i > 127 else 0 for i in range(256))
+
+# c * log2(c) for every bin count a default-sized (8 KiB) sample can produce, so entropy is #
+# log2(n) - sum(table[c]) / n: table loads instead of one log2 per occupied bin #
+_XLOG2X_SIZE = 8192
+_XLOG2X = [0.0] + [k * math.log2(k) for k in range(1, _XLOG2X_SIZE + 1)]
+
+
+def _entropy_stats_python(data: bytes) -> Tuple[float, float, float, float, float]:
+    """
+    Compute byte statistics without NumPy.
+
+    Args:
+        data (bytes): Non-empty sampled bytes.
+
+    Returns:
+        Tuple[float, float, float, float, float]:
+            (entropy, skew, null_byte_ratio, ascii_ratio, high_byte_ratio)
+    """
+    n = len(data)
+    counts = Counter(data)
+    if n <= _XLOG2X_SIZE:
+        table = _XLOG2X
+        entropy = math.log2(n) - sum(table[c] for c in counts.values()) / n
+    else:
+        entropy = -sum((c / n) * math.log2(c / n) for c in counts.values())
+
+    mean = n / 256
+    missing = 256 - len(counts)
+    var = (sum((c - mean) ** 2 for c in counts.values()) + missing * mean ** 2) / 256
+    # Avoid division by zero if var is 0 (e.g. all bytes are same) #
+    sd = math.sqrt(var) + 1e-8
+    skew = (sum(((c - mean) / sd) ** 3 for c in counts.values()) + missing * (-mean / sd) ** 3) / 256
+
+    null_byte_ratio = counts.get(0, 0) / n
+    ascii_ratio = data.translate(_ASCII_TABLE).count(1) / n
+    high_byte_ratio = data.translate(_HIGH_TABLE).count(1) / n
+    return entropy, skew, null_byte_ratio, ascii_ratio, high_byte_ratio
+
+
+def _entropy_stats_numpy(arr: "np.ndarray") -> Tuple[float, float, float, float, float]:
+    """
+    Compute byte statistics with vectorized NumPy operations.
+
+    Args:
+        arr (np.ndarray): Non-empty uint8 view of the sampled bytes.
+
+    Returns:
+        Tuple[float, float, float, float, float]:
+            (entropy, skew, null_byte_ratio, ascii_ratio, high_byte_ratio)
+    """
+    n = arr.size
+    counts = np.bincount(arr, minlength=256)
+    freqs = counts.astype(np.float64)
+
+    if n <= _XLOG2X_SIZE:
+        entropy = float(math.log2(n) - _XLOG2X_NP[counts].sum() / n)
+    else:
+        # Only non-zero bins contribute, which also avoids log2(0) #
+        p = freqs[freqs > 0] / n
+        entropy = float(-np.sum(p * np.log2(p)))
+
+    mean = n / 256.0
+    var = float(np.mean((freqs - mean) ** 2))
+    # Avoid division by zero if var is 0 (e.g. all bytes are same) #
+    skew = float(np.mean(((freqs - mean) / (np.sqrt(var) + 1e-8)) ** 3))
+
+    return (
+        entropy,
+        skew,
+        float(freqs[0] / n),
+        float(freqs[32:127].sum() / n),
+        float(freqs[128:].sum() / n),
+    )
+
+
+if NUMPY_AVAILABLE:
+    _XLOG2X_NP = np.array(_XLOG2X, dtype=np.float64)
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _entropy_stats(arr):
+        """Histogram, entropy, skew and byte-class ratios in one compiled pass."""
+        n = arr.size
+        counts = np.zeros(256, np.int64)
+        for b in arr:
+            counts[b] += 1
+
+        entropy = 0.0
+        var = 0.0
+        mean = n / 256.0
+        for c in counts:
+            if c > 0:
+                p = c / n
+                entropy -= p * np.log2(p)
+            d = c - mean
+            var += d * d
+        var /= 256.0
+
+        sd = np.sqrt(var) + 1e-8
+        skew = 0.0
+        for c in counts:
+            z = (c - mean) / sd
+            skew += z * z * z
+        skew /= 256.0
+
+        ascii_count = 0
+        for i in range(32, 127):
+            ascii_count += counts[i]
+        high_count = 0
+        for i in range(128, 256):
+            high_count += counts[i]
+
+        return entropy, skew, counts[0] / n, ascii_count / n, high_count / n
+
+    # Compile (or load from the on-disk cache) at import rather than inside the first scan. #
+    # bytes give read-only arrays and bytearrays writable ones; numba specializes on both #
+    _entropy_stats(np.frombuffer(b'\x00', dtype=np.uint8))
+    _entropy_stats(np.frombuffer(bytearray(1), dtype=np.uint8))
+
+
+def entropy_stats(data: bytes) -> Tuple[float, float, float, float, float]:
+    """
+    Compute the byte statistics used by the entropy scorer with the fastest available backend.
+
+    Args:
+        data (bytes): Non-empty sampled bytes (any bytes-like object).
+
+    Returns:
+        Tuple[float, float, float, float, float]:
+            (entropy, skew, null_byte_ratio, ascii_ratio, high_byte_ratio)
+    """
+    if SHANNON_AVAILABLE:
+        return shannon_stats(data)
+    if NUMBA_AVAILABLE:
+        return _entropy_stats(np.frombuffer(data, dtype=np.uint8))
+    if NUMPY_AVAILABLE:
+        return _entropy_stats_numpy(np.frombuffer(data, dtype=np.uint8))
+    return _entropy_stats_python(bytes(data))
+
+
+def entropy_stats_many(samples: Sequence[bytes]) -> List[Tuple[float, float, float, float, float]]:
+    """
+    Compute byte statistics for many samples at once.
+
+    Without a compiled kernel, every sample's histogram comes from a single bincount over
+    (row * 256 + byte) indices of the concatenated samples, and the remaining
+    statistics are computed column-wise for all rows together.
+
+    Args:
+        samples (Sequence[bytes]): Non-empty sampled byte strings (lengths may differ).
+
+    Returns:
+        List[Tuple[float, float, float, float, float]]: One
+            (entropy, skew, null_byte_ratio, ascii_ratio, high_byte_ratio) per sample.
+    """
+    # A compiled per-sample kernel beats the batched NumPy pass, which builds an int64 #
+    # index array as large as all samples combined #
+    if SHANNON_AVAILABLE or NUMBA_AVAILABLE or not NUMPY_AVAILABLE or len(samples) < 2:
+        return [entropy_stats(data) for data in samples]
+
+    rows = len(samples)
+    lengths = np.fromiter((len(data) for data in samples), dtype=np.int64, count=rows)
+    flat = np.frombuffer(b''.join(samples), dtype=np.uint8)
+    row_base = np.repeat(np.arange(rows, dtype=np.int64) * 256, lengths)
+    counts = np.bincount(row_base + flat, minlength=rows * 256).reshape(rows, 256)
+    freqs = counts.astype(np.float64)
+
+    n = lengths.astype(np.float64)[:, None]
+    if lengths.max() <= _XLOG2X_SIZE:
+        entropy = np.log2(n[:, 0]) - _XLOG2X_NP[counts].sum(axis=1) / n[:, 0]
+    else:
+        p = freqs / n
+        with np.errstate(divide='ignore', invalid='ignore'):
+            entropy = -np.sum(np.where(freqs > 0, p * np.log2(p), 0.0), axis=1)
+
+    mean = n / 256.0
+    var = np.mean((freqs - mean) ** 2, axis=1, keepdims=True)
+    # Avoid division by zero if var is 0 (e.g. all bytes are same) #
+    skew = np.mean(((freqs - mean) / (np.sqrt(var) + 1e-8)) ** 3, axis=1)
+
+    null_ratio = freqs[:, 0] / n[:, 0]
+    ascii_ratio = freqs[:, 32:127].sum(axis=1) / n[:, 0]
+    high_ratio = freqs[:, 128:].sum(axis=1) / n[:, 0]
+    return list(zip(entropy.tolist(), skew.tolist(), null_ratio.tolist(),
+                    ascii_ratio.tolist(), high_ratio.tolist()))
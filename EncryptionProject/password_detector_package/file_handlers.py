@@ -1,90 +1,464 @@
 # EncryptionProject/password_detector_package/file_handlers.py #
 
 import os
+import re
 import zipfile
-import sqlite3
+import importlib
+import importlib.util
+import contextlib
 import asyncio 
+import contextvars
+import queue
+import threading
+from typing import Awaitable, BinaryIO, Optional
+from .zip_fast import zip_encryption_flag, find_entry_records, read_entry
+from .rar_fast import rar_encryption_flag
+from .sevenzip_fast import sevenzip_encryption_flag
+from .cfbf_fast import cached_root_entry_names
+from .pdf_fast import pdf_encryption_flag
+from .entropy_kernel import entropy_stats
 
 # --- Optional Dependency Checks --- #
-# Check for availability of third-party libraries with graceful fallbacks #
-
-try:
-    import msoffcrypto
-    MSOFFCRYPTO_AVAILABLE = True
-except ImportError:
-    MSOFFCRYPTO_AVAILABLE = False
-try:
-    from PyPDF2 import PdfReader
-    from PyPDF2.errors import PdfReadError
-    PDF2_AVAILABLE = True
-except ImportError:
-    PDF2_AVAILABLE = False
-try:
-    import pikepdf
-    from pikepdf import PasswordError, Pdf
-    PIKEPDF_AVAILABLE = True
-except ImportError:
-    PIKEPDF_AVAILABLE = False
-try:
-    import rarfile
-    RARFILE_AVAILABLE = True
-except ImportError:
-    RARFILE_AVAILABLE = False
-try:
-    import py7zr
-    PY7ZR_AVAILABLE = True
-except ImportError:
-    PY7ZR_AVAILABLE = False
-try:
-    import pypff
-    PYPFF_AVAILABLE = True
-except ImportError:
-    PYPFF_AVAILABLE = False
-try:
-    import olefile
-    OLEFILE_AVAILABLE = True
-except ImportError:
-    OLEFILE_AVAILABLE = False
+# Availability comes from find_spec, which locates a package without importing it; #
+# the library itself is imported by _lazy() when the first file needs it #
+
+def _installed(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+MSOFFCRYPTO_AVAILABLE = _installed('msoffcrypto')
+PDF2_AVAILABLE = _installed('PyPDF2')
+PIKEPDF_AVAILABLE = _installed('pikepdf')
+RARFILE_AVAILABLE = _installed('rarfile')
+PY7ZR_AVAILABLE = _installed('py7zr')
+PYPFF_AVAILABLE = _installed('pypff')
+OLEFILE_AVAILABLE = _installed('olefile')
+
+_LAZY_MODULES = {}
+
+
+def _lazy(name: str):
+    """
+    Import an optional dependency on first use and remember the outcome.
+
+    Args:
+        name (str): Module name, e.g. 'pikepdf'.
+
+    Returns:
+        module: The imported module, or None if it cannot be imported.
+    """
+    try:
+        return _LAZY_MODULES[name]
+    except KeyError:
+        pass
+    # The import system serializes concurrent first imports of the same module #
+    try:
+        module = importlib.import_module(name)
+    except ImportError:
+        module = None
+    _LAZY_MODULES[name] = module
+    return module
+
+
+# ========== SHARED HELPERS ========== #
+
+# Seconds a handler thread waits for work before exiting #
+_DISPATCH_IDLE_TIMEOUT = 60.0
+
+
+def _resolve(fut: asyncio.Future, result, error: Optional[BaseException]) -> None:
+    # Runs on the event loop; the awaiting task may have been cancelled meanwhile #
+    if fut.cancelled():
+        return
+    if error is not None:
+        fut.set_exception(error)
+    else:
+        fut.set_result(result)
+
+
+class BlockingDispatcher:
+    """
+    Runs the handlers' blocking checks on persistent daemon threads fed by one queue.
+
+    A lighter asyncio.to_thread(): each call is one queue put and one
+    call_soon_threadsafe, without a concurrent.futures.Future chained to an asyncio
+    one. Like ThreadPoolExecutor, a thread is only started when none is idle, and a
+    thread left idle for a while exits, so an unused dispatcher holds no threads.
+    shutdown() lets queued checks finish and joins the threads, as the executor's does.
+    """
+
+    def __init__(self, max_threads: int):
+        """
+        Args:
+            max_threads (int): Upper bound on worker threads; the detector passes its max_workers,
+                capped at its executor's size.
+        """
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        # Under _lock: threads waiting with no job promised to them, and queued jobs #
+        # that found no such thread and wait for a busy one to finish #
+        self._idle = 0
+        self._backlog = 0
+        self._threads = 0
+        self._workers = set()
+        self._shutdown = False
+        self._max_threads = max(1, max_threads)
+
+    def submit(self, fn, *args) -> asyncio.Future:
+        """
+        Schedule fn(*args) on a worker thread.
+
+        The caller's context is copied as asyncio.to_thread does, so context variables
+        such as the per-analysis ole_cache are visible to fn.
+
+        Args:
+            fn (callable): Blocking function to run.
+            *args: Positional arguments for fn.
+
+        Returns:
+            asyncio.Future: Resolves on the running loop with fn's result or exception.
+
+        Raises:
+            RuntimeError: If the dispatcher has been shut down.
+        """
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError('cannot schedule new checks after shutdown')
+            self._queue.put((loop, fut, contextvars.copy_context(), fn, args))
+            if self._idle:
+                self._idle -= 1
+            elif self._threads < self._max_threads:
+                self._threads += 1
+                worker = threading.Thread(target=self._work, name=f'handler-{self._threads}', daemon=True)
+                self._workers.add(worker)
+                worker.start()
+            else:
+                self._backlog += 1
+        return fut
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop accepting checks and let the worker threads exit once the queued ones are done.
+
+        Args:
+            wait (bool): Join the worker threads before returning.
+        """
+        with self._lock:
+            self._shutdown = True
+            workers = list(self._workers)
+        # One stop marker per thread, queued behind every accepted check #
+        for _ in workers:
+            self._queue.put(None)
+        if wait:
+            for worker in workers:
+                worker.join()
+
+    def _retire(self) -> None:
+        # Called with _lock held #
+        self._threads -= 1
+        self._workers.discard(threading.current_thread())
+
+    def _work(self) -> None:
+        get = self._queue.get
+        while True:
+            try:
+                job = get(timeout=_DISPATCH_IDLE_TIMEOUT)
+            except queue.Empty:
+                with self._lock:
+                    # Retire with an unpromised idle slot; if submits took them all, work is on its way #
+                    if self._idle:
+                        self._idle -= 1
+                        self._retire()
+                        return
+                continue
+            if job is None:
+                with self._lock:
+                    self._retire()
+                return
+            loop, fut, ctx, fn, args = job
+            result, error = None, None
+            try:
+                result = ctx.run(fn, *args)
+            except BaseException as e:
+                error = e
+            # Idle before the result is posted, so the awaiting task's next call reuses this thread; #
+            # a queued job nobody was promised is taken first #
+            with self._lock:
+                if self._backlog:
+                    self._backlog -= 1
+                else:
+                    self._idle += 1
+            try:
+                loop.call_soon_threadsafe(_resolve, fut, result, error)
+            except RuntimeError:
+                pass  # The loop was closed while the check ran; nobody is waiting #
+            del job, loop, fut, ctx, fn, args, result, error
+
+
+# The dispatcher of the detector running the current analysis; set by analyze_file so #
+# each detector's max_workers bounds its own handler threads #
+# (ContextVar is only subscriptable from Python 3.9, hence the string annotation) #
+handler_dispatcher: 'contextvars.ContextVar[Optional[BlockingDispatcher]]' = contextvars.ContextVar(
+    'handler_dispatcher', default=None
+)
+
+
+def _run_blocking(fn, *args) -> Awaitable:
+    """
+    Run a handler's blocking check on the current detector's dispatcher.
+
+    Args:
+        fn (callable): Blocking function to run.
+        *args: Positional arguments for fn.
+
+    Returns:
+        Awaitable: fn's result; handlers awaited outside a detector use asyncio.to_thread.
+    """
+    dispatcher = handler_dispatcher.get()
+    if dispatcher is None:
+        return asyncio.to_thread(fn, *args)
+    return dispatcher.submit(fn, *args)
+
+
+def _ole_root_entries(path: str) -> frozenset:
+    """
+    List the streams and storages at the root of an OLE file.
+
+    The detector caches verdicts per stat_key, so a file reaches this at most once
+    per version and the directory is read without an extra stat for a cache key.
+
+    Args:
+        path (str): Path to the OLE compound file.
+
+    Returns:
+        frozenset: Lowercased entry names, matching olefile's case-insensitive exists().
+    """
+    names = cached_root_entry_names(path)
+    if names is not None:
+        return names
+    # Files the directory walker rejects (odd sector sizes, damaged chains) go to olefile #
+    olefile = _lazy('olefile')
+    if olefile is None:
+        raise ValueError('Unreadable compound file and olefile is not installed')
+    with olefile.OleFileIO(path) as ole:
+        return frozenset(entry[0].lower() for entry in ole.listdir(streams=True, storages=True)
+                         if len(entry) == 1)
+
+
+def _stream_contains(stream: BinaryIO, marker: bytes, chunk_size: int = 4096) -> bool:
+    """
+    Search a binary stream for a marker chunk by chunk, stopping at the first hit.
+
+    Args:
+        stream (BinaryIO): Readable stream, e.g. a zipfile member opened with ZipFile.open().
+        marker (bytes): Byte sequence to look for.
+        chunk_size (int): Bytes read (and, for zip members, decompressed) per step.
+
+    Returns:
+        bool: True if the marker occurs anywhere in the stream.
+    """
+    keep = len(marker) - 1
+    window = b''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return False
+        window = window[-keep:] + chunk if keep else chunk
+        if marker in window:
+            return True
+
+
+_SQLITE_MAGIC = b'SQLite format 3\x00'
+# Enough of the file to cover the first page of SQLCipher's 1 KiB (v1-3) and 4 KiB (v4) layouts #
+_SQLITE_PROBE_SIZE = 4096
+_SQLITE_MIN_PAGE = 1024
+# Random bytes score about 7.8 bits over 1 KiB and 7.95 over 4 KiB; structured data far less #
+_SQLITE_RANDOM_ENTROPY = 7.6
+
+
+def _sqlite_header_verdict(header: bytes):
+    """
+    Classify a file the type detector labelled SQLite from its first page alone.
+
+    A plain database always starts with the magic string followed by a valid page size
+    (a power of two from 512 to 32768, or 1 meaning 65536). SQLCipher and similar
+    encrypted stores encrypt the first page too: it starts with a 16-byte random salt and
+    reads as random bytes throughout. Anything else under a SQLite name (a truncated or
+    zero-filled file, text, another engine's .db) is left to the entropy fallback.
+
+    Args:
+        header (bytes): Leading bytes of the file (up to the first 4 KiB are inspected).
+
+    Returns:
+        Tuple[bool, bool, float]: (password_protected, encrypted, confidence)
+    """
+    if not header:
+        return False, False, 1.0  # SQLite treats an empty file as an empty database #
+    if header.startswith(_SQLITE_MAGIC):
+        page_size = int.from_bytes(header[16:18], 'big')
+        if page_size == 1 or (512 <= page_size <= 32768 and not page_size & (page_size - 1)):
+            return False, False, 1.0
+        return False, False, 0.0  # A damaged plain database; a salt would have replaced the magic #
+    page = header[:_SQLITE_PROBE_SIZE]
+    if (len(page) >= _SQLITE_MIN_PAGE and len(set(page[:16])) >= 12
+            and entropy_stats(page)[0] >= _SQLITE_RANDOM_ENTROPY):
+        return True, True, 0.9
+    return False, False, 0.0
+
+
+_ODF_ENCRYPTION_MARKER = b'manifest:encryption-data'
+_DOCUMENT_PROTECTION_MARKER = b'DocumentProtection'
+# Package members up to this size are inflated directly; larger ones (a manifest listing #
+# thousands of embedded objects) go through zipfile instead #
+_MEMBER_MAX_SIZE = 1 << 20
+
+# Library error messages that mean "locked", matched case-insensitively in one pass #
+# over str(e) instead of lowercasing a copy first #
+_ENCRYPTED_ERROR_RE = re.compile('encrypted', re.IGNORECASE)
+_PASSWORD_REQUIRED_RE = re.compile('password required', re.IGNORECASE)
+_PST_LOCKED_RE = re.compile('password|encrypted', re.IGNORECASE)
+
+
+# ========== CPU-BOUND BLOCKING CHECKS ========== #
+# Module-level (not nested in is_encrypted) so they can be pickled and run on a #
+# process pool; see CPU_BOUND_CHECKS at the end of this module #
+
+def _check_pdf_blocking(path, fp=None):
+    """
+    Parse a PDF with PyPDF2, then pikepdf, and probe whether it opens without a password.
+    `fp` is an already open binary file to parse instead of opening `path` again.
+    """
+    # A trailer without /Encrypt settles most files; the libraries only see encrypted #
+    # ones, to tell user-password from owner-only protection, and unreadable trailers #
+    if pdf_encryption_flag(fp if fp is not None else path) is False:
+        return False, False, 1.0
+    if fp is not None:
+        fp.seek(0)
+
+    PyPDF2 = _lazy('PyPDF2')
+    if PyPDF2 is not None:
+        try:
+            with (contextlib.nullcontext(fp) if fp is not None else open(path, 'rb')) as f:
+                reader = PyPDF2.PdfReader(f)
+                if reader.is_encrypted:
+                    try:
+                        if len(reader.pages) > 0:
+                            return False, True, 0.8
+                    except Exception:
+                        return True, True, 1.0
+                return False, False, 1.0
+        except PyPDF2.errors.PdfReadError as e:
+            if _PASSWORD_REQUIRED_RE.search(str(e)):
+                return True, True, 1.0
+            return False, False, 0.0
+        except Exception:
+            pass
+
+    pikepdf = _lazy('pikepdf')
+    if pikepdf is not None:
+        try:
+            if fp is not None:
+                fp.seek(0)
+            with pikepdf.Pdf.open(fp if fp is not None else path) as pdf:
+                if pdf.is_encrypted:
+                    try:
+                        pdf.pages[0]
+                        return False, True, 0.8
+                    except pikepdf.PasswordError:
+                        return True, True, 1.0
+            return False, False, 1.0
+        except Exception:
+            pass
+
+    return False, False, 0.0
+
+
+def _check_7z_blocking(path):
+    """Read the 7z headers for AES coders, asking py7zr only when they cannot be parsed."""
+    encrypted = sevenzip_encryption_flag(path)
+    if encrypted is not None:
+        return encrypted, encrypted, 1.0
+    py7zr = _lazy('py7zr')
+    if py7zr is None:
+        return False, False, 0.0
+    try:
+        with py7zr.SevenZipFile(path, mode='r') as z7:
+            needs_pass = z7.needs_password()
+            return needs_pass, needs_pass, 1.0
+    except Exception:
+        return False, False, 0.0
+
 
 # ========== HANDLER CLASSES ========== #
 
+async def _unavailable(file_path: str, fp: Optional[BinaryIO] = None, header: Optional[bytes] = None):
+    """Stand-in for handlers whose third-party library is not installed."""
+    return False, False, 0.0
+
+
 class OfficeOpenXMLHandler:
     """Handler for modern Office files (.docx, .xlsx, .pptx)"""
     
     @staticmethod
-    async def is_encrypted(file_path: str):
+    async def is_encrypted(file_path: str, fp: Optional[BinaryIO] = None, header: Optional[bytes] = None):
         def _check_openxml_blocking(path):
-            if not MSOFFCRYPTO_AVAILABLE:
+            if _lazy('msoffcrypto') is None:
                 return False, False, 0.0
+            # One open file serves msoffcrypto, the central-directory scan and zipfile #
+            if fp is not None:
+                return _check_openxml_file(fp)
             try:
                 with open(path, 'rb') as f:
-                    office_file = msoffcrypto.OfficeFile(f)
-                    
-                    if not office_file.is_encrypted():
-                        return False, False, 1.0
-                    
-                    try:
-                        office_file.load_key(password='')
-                        return False, True, 0.8
-                    except (msoffcrypto.exceptions.InvalidKeyError, 
-                           msoffcrypto.exceptions.DecryptionError):
-                        return True, True, 1.0
+                    return _check_openxml_file(f)
+            except OSError:
+                return False, False, 0.0
+
+        def _check_openxml_file(f):
+            msoffcrypto = _lazy('msoffcrypto')
+            try:
+                office_file = msoffcrypto.OfficeFile(f)
+                
+                if not office_file.is_encrypted():
+                    return False, False, 1.0
+                
+                try:
+                    office_file.load_key(password='')
+                    return False, True, 0.8
+                except (msoffcrypto.exceptions.InvalidKeyError, 
+                       msoffcrypto.exceptions.DecryptionError):
+                    return True, True, 1.0
                         
             except Exception:
+                # Central-directory names answer the marker checks without building a ZipFile, #
+                # and core.xml is inflated from its local header #
+                entries = find_entry_records(f, (b'EncryptedPackage', b'docProps/core.xml'))
+                if entries is not None:
+                    if b'EncryptedPackage' in entries:
+                        return True, True, 1.0
+                    core_record = entries.get(b'docProps/core.xml')
+                    if core_record is None:
+                        return False, False, 0.0
+                    core_data = read_entry(f, core_record, _MEMBER_MAX_SIZE)
+                    if core_data is not None:
+                        if _DOCUMENT_PROTECTION_MARKER in core_data:
+                            return True, False, 0.9
+                        return False, False, 0.0
                 try:
-                    with zipfile.ZipFile(path) as zf:
+                    with zipfile.ZipFile(f) as zf:
                         if 'EncryptedPackage' in zf.namelist():
                             return True, True, 1.0
                         if 'docProps/core.xml' in zf.namelist():
-                            core_data = zf.read('docProps/core.xml').decode('utf-8', errors='ignore')
-                            if 'DocumentProtection' in core_data:
+                            # The marker is ASCII, so the raw bytes are searched without decoding #
+                            if _DOCUMENT_PROTECTION_MARKER in zf.read('docProps/core.xml'):
                                 return True, False, 0.9
                 except Exception:
                     pass
 
             return False, False, 0.0
         
-        return await asyncio.to_thread(_check_openxml_blocking, file_path)
+        return await _run_blocking(_check_openxml_blocking, file_path)
 
 
 class OfficeLegacyHandler:
@@ -93,95 +467,62 @@ class OfficeLegacyHandler:
     @staticmethod
     async def is_encrypted(file_path: str):
         def _check_legacy_blocking(path):
-            if not OLEFILE_AVAILABLE:
-                return False, False, 0.0
             try:
-                with olefile.OleFileIO(path) as ole:
-                    if ole.exists('EncryptionInfo') or ole.exists('EncryptedPackage'):
-                        return True, True, 1.0
-                    if ole.exists('\x01CompObj') and ole.exists('\x05SummaryInformation'):
-                        return False, False, 0.5
+                entries = _ole_root_entries(path)
+                if 'encryptioninfo' in entries or 'encryptedpackage' in entries:
+                    return True, True, 1.0
+                if '\x01compobj' in entries and '\x05summaryinformation' in entries:
+                    return False, False, 0.5
             except Exception:
                 pass
             return False, False, 0.0
         
-        return await asyncio.to_thread(_check_legacy_blocking, file_path)
+        return await _run_blocking(_check_legacy_blocking, file_path)
 
 
 class PDFHandler:
     """Handler for PDF files"""
     
     @staticmethod
-    async def is_encrypted(file_path: str):
-        def _check_pdf_blocking(path):
-            if not (PDF2_AVAILABLE or PIKEPDF_AVAILABLE):
-                return False, False, 0.0
-
-            if PDF2_AVAILABLE:
-                try:
-                    with open(path, 'rb') as f:
-                        reader = PdfReader(f)
-                        if reader.is_encrypted:
-                            try:
-                                if len(reader.pages) > 0:
-                                    return False, True, 0.8
-                            except Exception:
-                                return True, True, 1.0
-                        return False, False, 1.0
-                except PdfReadError as e:
-                    if "password required" in str(e).lower():
-                        return True, True, 1.0
-                    return False, False, 0.0
-                except Exception:
-                    pass
-
-            if PIKEPDF_AVAILABLE:
-                try:
-                    with Pdf.open(path) as pdf:
-                        if pdf.is_encrypted:
-                            try:
-                                pdf.pages[0]
-                                return False, True, 0.8
-                            except PasswordError:
-                                return True, True, 1.0
-                    return False, False, 1.0
-                except Exception:
-                    pass
-
-            return False, False, 0.0
-        
-        return await asyncio.to_thread(_check_pdf_blocking, file_path)
+    async def is_encrypted(file_path: str, fp: Optional[BinaryIO] = None, header: Optional[bytes] = None):
+        return await _run_blocking(_check_pdf_blocking, file_path, fp)
 
 
 class ZIPHandler:
     """Handler for ZIP archive files."""
 
     @staticmethod
-    async def is_encrypted(file_path: str):
+    async def is_encrypted(file_path: str, fp: Optional[BinaryIO] = None, header: Optional[bytes] = None):
         def _check_zip_blocking(path):
+            if fp is not None:
+                return _check_zip_file(fp)
+            try:
+                with open(path, 'rb') as f:
+                    return _check_zip_file(f)
+            except OSError:
+                return False, False, 0.0
+
+        def _check_zip_file(f):
+            # Fast path: scan central directory flags without building ZipInfo objects #
+            encrypted = zip_encryption_flag(f)
+            if encrypted is not None:
+                return encrypted, encrypted, 1.0
+
+            # zipfile reuses the already open file instead of opening it again #
             try:
-                with zipfile.ZipFile(path, 'r') as zf:
+                with zipfile.ZipFile(f, 'r') as zf:
                     for file_info in zf.infolist():
                         if file_info.flag_bits & 0x1:
                             return True, True, 1.0
                     return False, False, 1.0
-            except zipfile.BadZipFile:
-                try:
-                    with zipfile.ZipFile(path) as zf:
-                        first_file = zf.infolist()[0]
-                        with zf.open(first_file) as f:
-                            f.read(1)
-                except RuntimeError as e:
-                    if 'encrypted' in str(e).lower():
-                        return True, True, 1.0
-                except Exception:
-                    pass
             except Exception:
+                # Includes BadZipFile: with no readable central directory there are no #
+                # entry flags to inspect, and reopening the same bytes fails the same way #
                 pass
                 
             return False, False, 0.0
         
-        return await asyncio.to_thread(_check_zip_blocking, file_path)
+        return await _run_blocking(_check_zip_blocking, file_path)
 
 
 class RARHandler:
@@ -190,7 +531,13 @@ class RARHandler:
     @staticmethod
     async def is_encrypted(file_path: str):
         def _check_rar_blocking(path):
-            if not RARFILE_AVAILABLE:
+            # Block headers carry every encryption marker; rarfile is the fallback for #
+            # layouts the walker rejects (e.g. self-extracting archives) #
+            encrypted = rar_encryption_flag(path)
+            if encrypted is not None:
+                return encrypted, encrypted, 1.0
+            rarfile = _lazy('rarfile')
+            if rarfile is None:
                 return False, False, 0.0
             try:
                 with rarfile.RarFile(path, 'r') as rf:
@@ -199,7 +546,7 @@ class RARHandler:
             except Exception:
                 return False, False, 0.0
         
-        return await asyncio.to_thread(_check_rar_blocking, file_path)
+        return await _run_blocking(_check_rar_blocking, file_path)
 
 
 class SevenZipHandler:
@@ -207,43 +554,29 @@ class SevenZipHandler:
     
     @staticmethod
     async def is_encrypted(file_path: str):
-        def _check_7z_blocking(path):
-            if not PY7ZR_AVAILABLE:
-                return False, False, 0.0
-                
-            try:
-                with py7zr.SevenZipFile(path, mode='r') as z7:
-                    needs_pass = z7.needs_password()
-                    return needs_pass, needs_pass, 1.0
-            except Exception:
-                return False, False, 0.0
-        
-        return await asyncio.to_thread(_check_7z_blocking, file_path)
+        return await _run_blocking(_check_7z_blocking, file_path)
 
 
 class SQLiteHandler:
     """Handler for SQLite databases"""
     
     @staticmethod
-    async def is_encrypted(file_path: str):
+    async def is_encrypted(file_path: str, fp: Optional[BinaryIO] = None, header: Optional[bytes] = None):
+        # The first page decides it; no connection, pager or query is needed #
+        if header is not None:
+            return _sqlite_header_verdict(header)
+
         def _check_sqlite_blocking(path):
             try:
-                conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
-                cursor = conn.cursor()
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table' LIMIT 1;")
-                cursor.fetchone()
-                cursor.close()
-                conn.close()
-                return False, False, 1.0
-            except sqlite3.DatabaseError as e:
-                if 'encrypted' in str(e).lower() or 'not a database' in str(e).lower():
-                    return True, True, 1.0
-            except Exception:
-                pass
-                
-            return False, False, 0.0
+                if fp is not None:
+                    fp.seek(0)
+                    return _sqlite_header_verdict(fp.read(_SQLITE_PROBE_SIZE))
+                with open(path, 'rb') as f:
+                    return _sqlite_header_verdict(f.read(_SQLITE_PROBE_SIZE))
+            except OSError:
+                return False, False, 0.0
         
-        return await asyncio.to_thread(_check_sqlite_blocking, file_path)
+        return await _run_blocking(_check_sqlite_blocking, file_path)
 
 
 class PSTHandler:
@@ -252,23 +585,23 @@ class PSTHandler:
     @staticmethod
     async def is_encrypted(file_path: str):
         def _check_pst_blocking(path):
-            if not PYPFF_AVAILABLE:
+            pypff = _lazy('pypff')
+            if pypff is None:
                 return False, False, 0.0
-                
             try:
                 pst = pypff.file()
                 pst.open(path)
                 pst.close()
                 return False, False, 1.0
             except pypff.Error as e:
-                if 'password' in str(e).lower() or 'encrypted' in str(e).lower():
+                if _PST_LOCKED_RE.search(str(e)):
                     return True, True, 1.0
             except Exception:
                 pass
                 
             return False, False, 0.0
         
-        return await asyncio.to_thread(_check_pst_blocking, file_path)
+        return await _run_blocking(_check_pst_blocking, file_path)
 
 
 class MSGHandler:
@@ -277,45 +610,95 @@ class MSGHandler:
     @staticmethod
     async def is_encrypted(file_path: str):
         def _check_msg_blocking(path):
-
-            if OLEFILE_AVAILABLE:
-                try:
-                    ole = olefile.OleFileIO(path)
-                    if ole.exists('EncryptedSummary'):
-                        ole.close()
-                        return True, True, 0.9
-                    ole.close()
-                except Exception:
-                    pass
+            try:
+                if 'encryptedsummary' in _ole_root_entries(path):
+                    return True, True, 0.9
+            except Exception:
+                pass
 
             return False, False, 0.0
         
-        return await asyncio.to_thread(_check_msg_blocking, file_path)
+        return await _run_blocking(_check_msg_blocking, file_path)
 
 
 class LibreOfficeHandler:
     """Handler for LibreOffice files (.ods, .odt, .odp, .odm)"""
     
     @staticmethod
-    async def is_encrypted(file_path: str):
+    async def is_encrypted(file_path: str, fp: Optional[BinaryIO] = None, header: Optional[bytes] = None):
         def _check_libreoffice_blocking(path):
+            if fp is not None:
+                return _check_libreoffice_file(fp)
+            try:
+                with open(path, 'rb') as f:
+                    return _check_libreoffice_file(f)
+            except OSError:
+                return False, False, 0.0
+
+        def _check_libreoffice_file(f):
+            # Entry names and flags come straight from the central directory, #
+            # so only the manifest is ever decompressed #
+            entries = find_entry_records(f, (b'META-INF/manifest.xml', b'content.xml'))
+            if entries is not None:
+                try:
+                    manifest_record = entries.get(b'META-INF/manifest.xml')
+                    if manifest_record is not None:
+                        # Inflated straight from its local header; zipfile is only needed #
+                        # for manifests read_entry() declines (ZIP64, unusual methods) #
+                        manifest = read_entry(f, manifest_record, _MEMBER_MAX_SIZE)
+                        if manifest is not None:
+                            if _ODF_ENCRYPTION_MARKER in manifest:
+                                return True, True, 1.0
+                        else:
+                            # Stream the manifest and stop at the marker: no full read, no decode #
+                            with zipfile.ZipFile(f) as zf, zf.open('META-INF/manifest.xml') as manifest:
+                                if _stream_contains(manifest, _ODF_ENCRYPTION_MARKER):
+                                    return True, True, 1.0
+                    # The encryption bit is what makes zipfile refuse to read content.xml #
+                    if entries.get(b'content.xml', (0,))[0] & 0x1:
+                        return True, True, 1.0
+                    return False, False, 1.0
+                except Exception:
+                    return False, False, 0.0
+
             try:
-                with zipfile.ZipFile(path) as zf:
+                with zipfile.ZipFile(f) as zf:
                     if 'META-INF/manifest.xml' in zf.namelist():
-                        manifest = zf.read('META-INF/manifest.xml').decode('utf-8', errors='ignore')
-                        if 'manifest:encryption-data' in manifest:
-                            return True, True, 1.0
+                        with zf.open('META-INF/manifest.xml') as manifest:
+                            if _stream_contains(manifest, _ODF_ENCRYPTION_MARKER):
+                                return True, True, 1.0
                     
                     try:
                         if 'content.xml' in zf.namelist():
                             zf.read('content.xml')
                         return False, False, 1.0
                     except RuntimeError as e:
-                        if 'encrypted' in str(e).lower():
+                        if _ENCRYPTED_ERROR_RE.search(str(e)):
                             return True, True, 1.0
             except Exception:
                 pass
                 
             return False, False, 0.0
         
-        return await asyncio.to_thread(_check_libreoffice_blocking, file_path)
+        return await _run_blocking(_check_libreoffice_blocking, file_path)
+
+
+# ========== IMPORT-TIME DISPATCH RESOLUTION ========== #
+# Handlers whose library is missing are swapped for the stub once, at import, #
+# so the per-file path carries no availability branches. RAR, 7z and the OLE #
+# formats keep their handlers: the header and directory walkers need no third-party library #
+
+if not MSOFFCRYPTO_AVAILABLE:
+    OfficeOpenXMLHandler.is_encrypted = staticmethod(_unavailable)
+if not (PDF2_AVAILABLE or PIKEPDF_AVAILABLE):
+    PDFHandler.is_encrypted = staticmethod(_unavailable)
+if not PYPFF_AVAILABLE:
+    PSTHandler.is_encrypted = staticmethod(_unavailable)
+
+# Checks the detector may hand to a process pool, keyed by file type. The PDF and 7z #
+# parsers are pure-Python heavy and would otherwise serialize on the GIL #
+CPU_BOUND_CHECKS = {}
+if PDF2_AVAILABLE or PIKEPDF_AVAILABLE:
+    CPU_BOUND_CHECKS['pdf'] = _check_pdf_blocking
+if PY7ZR_AVAILABLE:
+    CPU_BOUND_CHECKS['7z'] = _check_7z_blocking
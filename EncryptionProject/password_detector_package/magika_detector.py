@@ -2,15 +2,175 @@
 
 import os
 import asyncio 
-from magika import Magika
+import hashlib
+import platform
+import threading
+from typing import Optional, Tuple
+from .cache_utils import LRUCache
+from .result_cache import default_cache_dir
+
+# Map MIME types to our internal format identifiers; built once at import #
+MIME_MAP = {
+    'application/pdf': 'pdf',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': 'office_openxml',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': 'office_openxml',
+    'application/vnd.openxmlformats-officedocument.presentationml.presentation': 'office_openxml',
+    'application/vnd.ms-excel': 'office_legacy',
+    'application/vnd.ms-powerpoint': 'office_legacy',
+    'application/msword': 'office_legacy',
+    'application/zip': 'zip',
+    'application/x-rar': 'rar',
+    'application/x-7z-compressed': '7z',
+    'application/vnd.sqlite3': 'sqlite',
+    'application/vnd.ms-outlook': 'msg',
+    'application/vnd.oasis.opendocument.text': 'libre_office',
+    'application/vnd.oasis.opendocument.spreadsheet': 'libre_office',
+    'application/vnd.oasis.opendocument.presentation': 'libre_office',
+    'application/vnd.oasis.opendocument.graphics': 'libre_office',
+    'application/vnd.oasis.opendocument.formula': 'libre_office',
+    'application/vnd.oasis.opendocument.database': 'libre_office',
+    'application/octet-stream': 'unknown',
+}
+
+# MIME families mapped by prefix when the exact type is not listed in MIME_MAP #
+MIME_PREFIXES = (
+    ('application/vnd.openxmlformats-officedocument', 'office_openxml'),
+    ('application/vnd.oasis.opendocument', 'libre_office'),
+    ('application/vnd.ms-', 'office_legacy'),
+)
+
+
+# Magika's features come from the first and last block of a file (block_size in its model #
+# config) plus the file size, so those bytes decide the prediction #
+_FEATURE_BLOCK = 4096
+
+
+def _mime_to_tag(mime: str) -> str:
+    """Map a Magika MIME type to an internal format identifier ('unknown' if unmapped)."""
+    tag = MIME_MAP.get(mime)
+    if tag is None:
+        # Variants missing from the exact map (e.g. OOXML templates) match by family #
+        tag = next((t for prefix, t in MIME_PREFIXES if mime.startswith(prefix)), 'unknown')
+    return tag
+
+
+def _content_key(file_path: str) -> Optional[Tuple[int, bytes]]:
+    """
+    Key a file by exactly what Magika looks at, so identical binaries are classified once.
+
+    Args:
+        file_path (str): Path to the file
+
+    Returns:
+        Optional[Tuple[int, bytes]]: (size, digest of the first and last block), or None if unreadable
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            digest = hashlib.blake2b(f.read(_FEATURE_BLOCK), digest_size=16)
+            if size > _FEATURE_BLOCK:
+                f.seek(max(_FEATURE_BLOCK, size - _FEATURE_BLOCK))
+                digest.update(f.read(_FEATURE_BLOCK))
+    except OSError:
+        return None
+    return size, digest.digest()
+
+
+def _magika_class():
+    """
+    Magika subclass whose ONNX session is built from an optimized model cached on disk.
+
+    The first run saves onnxruntime's fully optimized graph next to the other caches;
+    later runs load it with graph optimization switched off. Falls back to plain
+    Magika when its internals differ from what is overridden here.
+    """
+    from magika import Magika
+    try:
+        import onnxruntime as rt
+    except ImportError:
+        return Magika
+    if not callable(getattr(Magika, '_init_onnx_session', None)):
+        return Magika
+
+    class _CachedSessionMagika(Magika):
+        def _init_onnx_session(self):
+            try:
+                return _cached_session(rt, str(self._model_path))
+            except Exception:
+                return super()._init_onnx_session()
+
+    return _CachedSessionMagika
+
+
+def _cached_session(rt, model_path: str):
+    """Load (or create and save) the optimized ONNX model for this model file, runtime and host."""
+    options = rt.SessionOptions()
+    # Detection runs many single-file inferences from concurrent threads; one intra-op #
+    # thread per call avoids oversubscribing the cores #
+    options.intra_op_num_threads = 1
+    st = os.stat(model_path)
+    # Fully optimized graphs may contain CPU-specific kernels, so the host is part of the key #
+    name = f'magika-{rt.__version__}-{platform.node()}-{platform.machine()}-{st.st_size}-{st.st_mtime_ns}.opt.onnx'
+    cached = os.path.join(default_cache_dir(), name)
+
+    if os.path.exists(cached):
+        options.graph_optimization_level = rt.GraphOptimizationLevel.ORT_DISABLE_ALL
+        try:
+            return rt.InferenceSession(cached, options, providers=['CPUExecutionProvider'])
+        except Exception:
+            os.remove(cached)  # Truncated or foreign file; rebuilt below #
+            options = rt.SessionOptions()
+            options.intra_op_num_threads = 1
+
+    os.makedirs(default_cache_dir(), exist_ok=True)
+    # Written under a private name and renamed, so a concurrent run never loads a partial file #
+    partial = f'{cached}.{os.getpid()}.tmp'
+    options.graph_optimization_level = rt.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.optimized_model_filepath = partial
+    options.log_severity_level = 3  # The "hardware specific" notice is expected here #
+    session = rt.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+    try:
+        os.replace(partial, cached)
+    except OSError:
+        pass
+    return session
 
 
 class MagikaDetector:
     """File type detection using Google's Magika machine learning model."""
     
-    def __init__(self):
-        """Initialize Magika model."""
-        self.model = Magika()
+    def __init__(self, cache_size: int = 4096):
+        """
+        Prepare a detector; the Magika model is loaded on the first detection.
+
+        Args:
+            cache_size (int): Maximum number of distinct file contents remembered.
+        """
+        self.model = None
+        self._model_lock = threading.Lock()
+        # Keyed by _content_key(), so copies of one binary under different names or #
+        # inodes reach the model only once #
+        self._cache = LRUCache(maxsize=cache_size)
+
+    def _get_model(self):
+        """Return the Magika model, importing and loading it the first time (blocking)."""
+        if self.model is None:
+            # Importing magika and loading its ONNX model takes a noticeable fraction of a #
+            # second; runs that never reach the model (all signatures known) skip it #
+            with self._model_lock:
+                if self.model is None:
+                    self.model = _magika_class()()
+        return self.model
+
+    def _identify(self, file_path: str) -> str:
+        """Run Magika on one file, unless the same content was already seen (blocking)."""
+        key = _content_key(file_path)
+        tag = self._cache.get(key) if key is not None else None
+        if tag is None:
+            tag = _mime_to_tag(self._get_model().identify_path(file_path).output.mime_type)
+            if key is not None:
+                self._cache.put(key, tag)
+        return tag
 
     async def detect(self, file_path: str) -> str:
         """
@@ -24,33 +184,7 @@ class MagikaDetector:
                   Returns 'unknown' if detection fails
         """
         try:
-            # Magika's identify_path is blocking, run in a separate thread #
-            result = await asyncio.to_thread(self.model.identify_path, file_path)
-            mime = result.output.mime_type
+            # Magika's identify_path (and the first model load) is blocking, run in a separate thread #
+            return await asyncio.to_thread(self._identify, file_path)
         except Exception:
             return 'unknown'
-
-        # Map MIME types to our internal format identifiers #
-        mime_map = {
-            'application/pdf': 'pdf',
-            'application/vnd.openxmlformats-officedocument.wordprocessingml.document': 'office_openxml',
-            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': 'office_openxml',
-            'application/vnd.openxmlformats-officedocument.presentationml.presentation': 'office_openxml',
-            'application/vnd.ms-excel': 'office_legacy',
-            'application/vnd.ms-powerpoint': 'office_legacy',
-            'application/msword': 'office_legacy',
-            'application/zip': 'zip',
-            'application/x-rar': 'rar',
-            'application/x-7z-compressed': '7z',
-            'application/vnd.sqlite3': 'sqlite',
-            'application/vnd.ms-outlook': 'msg',
-            'application/vnd.oasis.opendocument.text': 'libre_office',
-            'application/vnd.oasis.opendocument.spreadsheet': 'libre_office',
-            'application/vnd.oasis.opendocument.presentation': 'libre_office',
-            'application/vnd.oasis.opendocument.graphics': 'libre_office',
-            'application/vnd.oasis.opendocument.formula': 'libre_office',
-            'application/vnd.oasis.opendocument.database': 'libre_office',
-            'application/octet-stream': 'unknown',
-        }
-
-        return mime_map.get(mime, 'unknown')
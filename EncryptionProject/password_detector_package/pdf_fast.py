@@ -0,0 +1,121 @@
+# EncryptionProject/password_detector_package/pdf_fast.py #
+
+import os
+import re
+from typing import BinaryIO, Optional, Union
+
+# Minimal PDF trailer reader. An encrypted PDF must name its encryption dictionary #
+# with /Encrypt in the trailer of its newest cross-reference section, so reading that #
+# one dictionary tells plain files apart without building PyPDF2's object model. #
+# Only a lone section settles "not encrypted": linearized files and incremental #
+# updates chain several (/Prev), and those are left to the PDF libraries #
+
+# %%EOF must sit within the last 1024 bytes; some writers append a little more junk #
+_TAIL_SIZE = 4096
+# The linearization dictionary is the first object, within the first 1024 bytes #
+_HEAD_SIZE = 1024
+# The trailer dictionary, or that of a cross-reference stream (which precedes its data) #
+_DICT_WINDOW = 4096
+# Tables split into more subsections than this are left to the libraries #
+_MAX_SUBSECTIONS = 1024
+# Each cross-reference table entry is exactly 20 bytes, end of line included #
+_XREF_ENTRY_SIZE = 20
+
+_STARTXREF_RE = re.compile(rb'startxref\s+(\d+)')
+_XREF_STREAM_RE = re.compile(rb'\s*\d+\s+\d+\s+obj\b')
+_XREF_SUBSECTION_RE = re.compile(rb'\s*(\d+)[ \t]+(\d+)[ \t]*(?:\r\n|\r|\n)')
+_TRAILER_RE = re.compile(rb'\s*trailer')
+_XREF_TYPE_RE = re.compile(rb'/Type\s*/XRef(?![A-Za-z0-9])')
+# /EncryptMetadata belongs to the encryption dictionary itself, not the trailer #
+_ENCRYPT_RE = re.compile(rb'/Encrypt(?![A-Za-z0-9])')
+_PREV_RE = re.compile(rb'/Prev(?![A-Za-z0-9])')
+_LINEARIZED_RE = re.compile(rb'/Linearized(?![A-Za-z0-9])')
+
+Source = Union[str, os.PathLike, BinaryIO]
+
+
+def pdf_encryption_flag(source: Source) -> Optional[bool]:
+    """
+    Check whether a PDF has an encryption dictionary, from its newest trailer alone.
+
+    Args:
+        source (Source): Path to the PDF or an open binary file object.
+
+    Returns:
+        Optional[bool]: True if the trailer references /Encrypt, False if it does not,
+                        None if the trailer could not be located (left to the PDF libraries).
+    """
+    try:
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f:
+                return _encryption_flag(f)
+        return _encryption_flag(source)
+    except (OSError, ValueError):
+        return None
+
+
+def _encryption_flag(f: BinaryIO) -> Optional[bool]:
+    f.seek(0)
+    head = f.read(_HEAD_SIZE)
+    f.seek(0, 2)
+    size = f.tell()
+    f.seek(max(0, size - _TAIL_SIZE))
+    tail = f.read(_TAIL_SIZE)
+
+    matches = list(_STARTXREF_RE.finditer(tail))
+    if not matches:
+        return None
+    offset = int(matches[-1].group(1))
+    if offset >= size:
+        return None
+
+    f.seek(offset)
+    section = f.read(_DICT_WINDOW)
+    if section.startswith(b'xref'):
+        trailer = _table_trailer(f, offset + 4)
+        if trailer is None:
+            return None
+    elif _XREF_STREAM_RE.match(section):
+        # Cross-reference stream: the stream dictionary doubles as the trailer #
+        end = section.find(b'stream')
+        if end < 0:
+            return None
+        trailer = section[:end]
+        if not _XREF_TYPE_RE.search(trailer):
+            return None
+    else:
+        return None  # Offsets shifted by prepended data, or a damaged file #
+
+    if _ENCRYPT_RE.search(trailer):
+        return True
+    # An older section, or the other half of a linearized file, may hold the answer #
+    if _PREV_RE.search(trailer) or _LINEARIZED_RE.search(head):
+        return None
+    return False
+
+
+def _table_trailer(f: BinaryIO, pos: int) -> Optional[bytes]:
+    """
+    Skip a classic cross-reference table and return the trailer dictionary after it.
+
+    Args:
+        f (BinaryIO): Open PDF file.
+        pos (int): Offset just past the table's 'xref' keyword.
+
+    Returns:
+        Optional[bytes]: Bytes from 'trailer' up to the following 'startxref',
+                         or None if the table does not have the standard layout.
+    """
+    for _ in range(_MAX_SUBSECTIONS):
+        f.seek(pos)
+        window = f.read(_DICT_WINDOW)
+        found = _TRAILER_RE.match(window)
+        if found:
+            end = window.find(b'startxref', found.end())
+            return window[found.start():end] if end >= 0 else None
+        subsection = _XREF_SUBSECTION_RE.match(window)
+        if subsection is None:
+            return None
+        # Entries are fixed-width, so the next subsection or the trailer is a seek away #
+        pos += subsection.end() + int(subsection.group(2)) * _XREF_ENTRY_SIZE
+    return None
@@ -0,0 +1,160 @@
+# EncryptionProject/password_detector_package/prefetcher.py #
+
+import os
+import stat
+import queue
+import asyncio
+import threading
+from typing import AsyncIterator, Iterable, Iterator, Optional, Tuple
+from .entropy import SPREAD_SAMPLE_MIN_SIZE
+
+# Bytes advised at the head of each file (and tail/middle of large ones): covers the #
+# sniffed prefix, the entropy sample and the ZIP/PDF trailers at the end #
+PREFETCH_SIZE = 65536
+# How many files the background walk may run ahead of the analysis #
+PREFETCH_DEPTH = 64
+
+# posix_fadvise is missing on Windows and macOS; there only the walk moves to the thread #
+FADVISE_AVAILABLE = hasattr(os, 'posix_fadvise')
+
+_OPEN_FLAGS = os.O_RDONLY | getattr(os, 'O_BINARY', 0)
+_DONE = object()
+
+FileItem = Tuple[str, Optional[os.stat_result]]
+
+
+def _advise(path: str, st: Optional[os.stat_result]) -> None:
+    """Ask the kernel to start reading the parts of a file the analysis will touch."""
+    # Only regular files: opening a FIFO or device could block or have side effects #
+    if st is None or not stat.S_ISREG(st.st_mode) or st.st_size == 0:
+        return
+    try:
+        fd = os.open(path, _OPEN_FLAGS)
+    except OSError:
+        return
+    try:
+        size = st.st_size
+        os.posix_fadvise(fd, 0, PREFETCH_SIZE, os.POSIX_FADV_WILLNEED)
+        if size > PREFETCH_SIZE:
+            os.posix_fadvise(fd, size - PREFETCH_SIZE, PREFETCH_SIZE, os.POSIX_FADV_WILLNEED)
+        if size >= SPREAD_SAMPLE_MIN_SIZE:
+            os.posix_fadvise(fd, size // 2, PREFETCH_SIZE, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def prefetch(items: Iterable[FileItem], depth: int = PREFETCH_DEPTH) -> Iterator[FileItem]:
+    """
+    Yield (path, stat_result) items unchanged while a background thread walks ahead.
+
+    The thread pulls up to `depth` items from `items` ahead of the consumer and, where
+    posix_fadvise exists, issues POSIX_FADV_WILLNEED for each file, so the kernel reads
+    the next files' headers while the current one is analyzed.
+
+    Args:
+        items (Iterable[FileItem]): Source of files, e.g. detector._iter_files(directory).
+        depth (int): Maximum number of items walked but not yet consumed.
+
+    Yields:
+        FileItem: The items of `items`, in order.
+    """
+    pending = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def _walk():
+        try:
+            for path, st in items:
+                if stop.is_set():
+                    return
+                if FADVISE_AVAILABLE:
+                    _advise(path, st)
+                pending.put((path, st))
+        except BaseException as e:
+            pending.put((_DONE, e))
+        else:
+            pending.put((_DONE, None))
+
+    walker = threading.Thread(target=_walk, name='prefetcher', daemon=True)
+    walker.start()
+    try:
+        while True:
+            item = pending.get()
+            if item[0] is _DONE:
+                if item[1] is not None:
+                    raise item[1]  # The walk's own error, re-raised in the consumer #
+                return
+            yield item
+    finally:
+        # The consumer may stop early; unblock a walker waiting on a full queue #
+        stop.set()
+        while walker.is_alive():
+            try:
+                pending.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+
+async def aprefetch(items: Iterable[FileItem], depth: int = PREFETCH_DEPTH) -> AsyncIterator[FileItem]:
+    """
+    Async counterpart of prefetch() for consumers on an event loop.
+
+    The walk thread hands items to the loop with call_soon_threadsafe, so waiting for
+    a slow walk, and stopping it early, never blocks the loop's other tasks.
+
+    Args:
+        items (Iterable[FileItem]): Source of files, e.g. detector._iter_files(directory).
+        depth (int): Maximum number of items walked but not yet consumed.
+
+    Yields:
+        FileItem: The items of `items`, in order.
+    """
+    loop = asyncio.get_running_loop()
+    pending = asyncio.Queue()
+    slots = threading.Semaphore(depth)
+    stop = threading.Event()
+
+    def _post(item):
+        try:
+            loop.call_soon_threadsafe(pending.put_nowait, item)
+        except RuntimeError:
+            stop.set()  # The loop is closed; nobody will consume the rest #
+
+    def _walk():
+        error = None
+        try:
+            for path, st in items:
+                if stop.is_set():
+                    break
+                if FADVISE_AVAILABLE:
+                    _advise(path, st)
+                slots.acquire()
+                if stop.is_set():
+                    break
+                _post((path, st))
+        except BaseException as e:
+            error = e
+        # Always posted last, so the consumer knows the thread is done with `items` #
+        _post((_DONE, error))
+
+    threading.Thread(target=_walk, name='prefetcher', daemon=True).start()
+    finished = False
+    try:
+        while True:
+            item = await pending.get()
+            if item[0] is _DONE:
+                finished = True
+                if item[1] is not None:
+                    raise item[1]  # The walk's own error, re-raised in the consumer #
+                return
+            slots.release()
+            yield item
+    finally:
+        if not finished:
+            # The consumer stopped early: wake a walker waiting for a slot and wait, #
+            # without blocking the loop, until it has let go of `items` #
+            stop.set()
+            slots.release()
+            while (await pending.get())[0] is not _DONE:
+                pass
@@ -0,0 +1,150 @@
+# EncryptionProject/password_detector_package/rar_fast.py #
+
+import os
+import struct
+import zlib
+from typing import BinaryIO, Optional, Tuple, Union
+
+# Minimal RAR block walker. Password protection shows up as an archive encryption #
+# header (RAR5), the encrypted-headers flag of the main header (RAR 3.x/4.x), or a #
+# per-file encryption marker, so only block headers are read and file data is skipped #
+
+_RAR5_SIG = b'Rar!\x1a\x07\x01\x00'
+_RAR4_SIG = b'Rar!\x1a\x07\x00'
+
+# RAR5 header types, header flags and file extra record type #
+_R5_FILE = 2
+_R5_CRYPT = 4
+_R5_END = 5
+_R5_HAS_EXTRA = 0x0001
+_R5_HAS_DATA = 0x0002
+_R5_FILE_CRYPT_RECORD = 0x01
+_R5_PEEK = 4 + 3            # CRC32 plus a header size vint (at most 3 bytes for 2 MiB) #
+
+# RAR 4.x block types and flags #
+_R4_BLOCK = struct.Struct('<HBHH')  # CRC16, type, flags, header size #
+_R4_MAIN = 0x73
+_R4_FILE = 0x74
+_R4_END = 0x7B
+_R4_MAIN_PASSWORD = 0x0080         # Block headers are encrypted #
+_R4_FILE_PASSWORD = 0x0004
+_R4_FILE_LARGE = 0x0100            # 64-bit sizes: high pack size at offset 32 #
+_R4_LONG_BLOCK = 0x8000            # ADD_SIZE follows the base header #
+
+Source = Union[str, os.PathLike, BinaryIO]
+
+
+def rar_encryption_flag(source: Source) -> Optional[bool]:
+    """
+    Check whether a RAR archive needs a password, from its block headers alone.
+
+    Args:
+        source (Source): Path to the archive or an open binary file object.
+
+    Returns:
+        Optional[bool]: True if the headers or any file are encrypted, False if nothing is,
+                        None if the blocks could not be walked (left to rarfile).
+    """
+    try:
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f:
+                return _encryption_flag(f)
+        return _encryption_flag(source)
+    except (OSError, IndexError, ValueError, struct.error):
+        return None
+
+
+def _encryption_flag(f: BinaryIO) -> Optional[bool]:
+    f.seek(0)
+    signature = f.read(len(_RAR5_SIG))
+    if signature == _RAR5_SIG:
+        return _rar5_encrypted(f, len(_RAR5_SIG))
+    if signature.startswith(_RAR4_SIG):
+        return _rar4_encrypted(f, len(_RAR4_SIG))
+    return None
+
+
+def _rar5_encrypted(f: BinaryIO, pos: int) -> Optional[bool]:
+    start, size = pos, f.seek(0, 2)
+    while True:
+        if pos >= size:
+            # Archive without an end-of-archive header, unless it was cut short #
+            return False if start < pos == size else None
+        f.seek(pos)
+        peek = f.read(_R5_PEEK)
+        crc, = struct.unpack_from('<L', peek)
+        header_size, data_start = _vint(peek, 4)
+        f.seek(pos + 4)
+        raw = f.read(data_start - 4 + header_size)
+        if len(raw) != data_start - 4 + header_size or zlib.crc32(raw) != crc:
+            return None
+        header = raw[data_start - 4:]
+
+        header_type, p = _vint(header, 0)
+        flags, p = _vint(header, p)
+        extra_size = data_size = 0
+        if flags & _R5_HAS_EXTRA:
+            extra_size, p = _vint(header, p)
+        if flags & _R5_HAS_DATA:
+            data_size, p = _vint(header, p)
+
+        if header_type == _R5_CRYPT:
+            return True
+        if header_type == _R5_END:
+            return False
+        if header_type == _R5_FILE and extra_size:
+            # The extra area is the tail of the header: (size, type, data) records #
+            r = header_size - extra_size
+            while r < header_size:
+                record_size, q = _vint(header, r)
+                record_type, _ = _vint(header, q)
+                if record_type == _R5_FILE_CRYPT_RECORD:
+                    return True
+                r = q + record_size
+        pos += data_start + header_size + data_size
+
+
+def _rar4_encrypted(f: BinaryIO, pos: int) -> Optional[bool]:
+    start, size = pos, f.seek(0, 2)
+    while True:
+        if pos >= size:
+            # Old archives may end without an end-of-archive block; a cut-off one is left to rarfile #
+            return False if start < pos == size else None
+        f.seek(pos)
+        base = f.read(_R4_BLOCK.size)
+        crc, block_type, flags, header_size = _R4_BLOCK.unpack(base)
+        if header_size < _R4_BLOCK.size:
+            return None
+        f.seek(pos)
+        header = f.read(header_size)
+        if len(header) != header_size or zlib.crc32(header[2:]) & 0xFFFF != crc:
+            return None
+
+        if block_type == _R4_MAIN and flags & _R4_MAIN_PASSWORD:
+            return True
+        if block_type == _R4_END:
+            return False
+        data_size = 0
+        if block_type == _R4_FILE:
+            if flags & _R4_FILE_PASSWORD:
+                return True
+            data_size, = struct.unpack_from('<L', header, 7)
+            if flags & _R4_FILE_LARGE:
+                data_size |= struct.unpack_from('<L', header, 32)[0] << 32
+        elif flags & _R4_LONG_BLOCK:
+            data_size, = struct.unpack_from('<L', header, 7)
+        pos += header_size + data_size
+
+
+def _vint(buf: bytes, pos: int) -> Tuple[int, int]:
+    """Decode a RAR5 variable-length integer (7 bits per byte, high bit = more bytes follow)."""
+    value = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+        if shift > 63:
+            raise ValueError('RAR vint is too long')
@@ -0,0 +1,130 @@
+# EncryptionProject/password_detector_package/result_cache.py #
+
+import os
+import sqlite3
+import threading
+from typing import Hashable, Optional, Tuple
+
+# Bump whenever classification logic changes so stale verdicts from older versions are dropped #
+RESULT_SCHEMA_VERSION = 9
+# Pending inserts are committed in one transaction once this many accumulate #
+_COMMIT_EVERY = 512
+
+
+def default_cache_dir() -> str:
+    """
+    Per-user directory for the detector's on-disk caches.
+
+    Returns:
+        str: password_detector under $XDG_CACHE_HOME, else under ~/.cache.
+    """
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'password_detector')
+
+
+def default_cache_path() -> str:
+    """
+    Location of the on-disk result cache.
+
+    Returns:
+        str: $DETECTOR_CACHE if set, else results.sqlite3 in default_cache_dir().
+    """
+    return os.environ.get('DETECTOR_CACHE') or os.path.join(default_cache_dir(), 'results.sqlite3')
+
+
+class ResultStore:
+    """
+    Persistent memo of analysis verdicts keyed by stat_key() plus the extension, so
+    re-scans skip unchanged files.
+
+    Any change to a file's device, inode, size, mtime or extension produces a new
+    key, so entries never need explicit invalidation.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path (Optional[str]): Database file; defaults to default_cache_path().
+        """
+        self.path = path or default_cache_path()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Lookups come from the event loop thread and flushes may come from another #
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._pending = []
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        if self._conn.execute('PRAGMA user_version').fetchone()[0] != RESULT_SCHEMA_VERSION:
+            self._conn.execute('DROP TABLE IF EXISTS results')
+            self._conn.execute(f'PRAGMA user_version={RESULT_SCHEMA_VERSION}')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS results ('
+            'key TEXT PRIMARY KEY, password_protected INTEGER, encrypted INTEGER, confidence REAL'
+            ') WITHOUT ROWID'
+        )
+
+    def get(self, key: Hashable) -> Optional[Tuple[bool, bool, float]]:
+        """
+        Look up a stored verdict.
+
+        Args:
+            key (Hashable): stat_key() of the file followed by its lowercased extension.
+
+        Returns:
+            Optional[Tuple[bool, bool, float]]: (password_protected, encrypted, confidence), or None.
+        """
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    'SELECT password_protected, encrypted, confidence FROM results WHERE key = ?', (repr(key),)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        return bool(row[0]), bool(row[1]), row[2]
+
+    def put(self, key: Hashable, verdict: Tuple[bool, bool, float]) -> None:
+        """
+        Queue a verdict for storage; it is written with the next batch commit.
+
+        Args:
+            key (Hashable): stat_key() of the file followed by its lowercased extension.
+            verdict (Tuple[bool, bool, float]): (password_protected, encrypted, confidence)
+        """
+        password_protected, encrypted, confidence = verdict
+        with self._lock:
+            self._pending.append((repr(key), int(password_protected), int(encrypted), float(confidence)))
+            if len(self._pending) >= _COMMIT_EVERY:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        """Write every queued verdict to disk."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        try:
+            with self._conn:
+                self._conn.executemany('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)', batch)
+        except sqlite3.Error:
+            pass  # Caching is best effort; a locked or read-only database only costs speed #
+
+    def close(self) -> None:
+        """Flush queued verdicts and close the database."""
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> 'ResultStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
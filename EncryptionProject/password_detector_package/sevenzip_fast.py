@@ -0,0 +1,253 @@
+# EncryptionProject/password_detector_package/sevenzip_fast.py #
+
+import os
+import struct
+import zlib
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+try:
+    import lzma
+    LZMA_AVAILABLE = True
+except ImportError:
+    LZMA_AVAILABLE = False
+
+# Minimal 7z header reader. Whether an archive needs a password only depends on the #
+# coders of its folders (AES-256 is method 06F10701), so this reads the signature #
+# header and the folder list instead of building py7zr's full archive model #
+
+_SIGNATURE = b"7z\xbc\xaf\x27\x1c"
+_SIGNATURE_HEADER = struct.Struct('<6s2BLQQL')  # Signature header (32 bytes) #
+_AES = b'\x06\xf1\x07\x01'
+_LZMA = b'\x03\x01\x01'
+_LZMA2 = b'\x21'
+# The folder list sits at the start of the header; a larger header is read only this far #
+_MAX_HEADER_READ = 1 << 20
+# A compressed header bigger than this is left to py7zr #
+_MAX_DECODED_HEADER = 16 << 20
+
+# Property IDs #
+_K_END = 0x00
+_K_HEADER = 0x01
+_K_ARCHIVE_PROPERTIES = 0x02
+_K_ADDITIONAL_STREAMS_INFO = 0x03
+_K_MAIN_STREAMS_INFO = 0x04
+_K_PACK_INFO = 0x06
+_K_UNPACK_INFO = 0x07
+_K_SIZE = 0x09
+_K_CRC = 0x0A
+_K_FOLDER = 0x0B
+_K_CODERS_UNPACK_SIZE = 0x0C
+_K_ENCODED_HEADER = 0x17
+
+# Truncated buffers raise IndexError; malformed or unsupported structures raise ValueError #
+_PARSE_ERRORS = (OSError, IndexError, ValueError) + ((lzma.LZMAError,) if LZMA_AVAILABLE else ())
+
+Source = Union[str, os.PathLike, BinaryIO]
+# One folder: its coders as (method id, properties) #
+Folder = List[Tuple[bytes, bytes]]
+
+
+def sevenzip_encryption_flag(source: Source) -> Optional[bool]:
+    """
+    Check whether a 7z archive needs a password, from its headers alone.
+
+    Args:
+        source (Source): Path to the archive or an open binary file object.
+
+    Returns:
+        Optional[bool]: True if the header or any folder is AES-encrypted, False if none is,
+                        None if the headers could not be read (left to py7zr).
+    """
+    try:
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f:
+                return _encryption_flag(f)
+        return _encryption_flag(source)
+    except _PARSE_ERRORS:
+        return None
+
+
+def _encryption_flag(f: BinaryIO) -> Optional[bool]:
+    f.seek(0)
+    start = f.read(_SIGNATURE_HEADER.size)
+    if len(start) != _SIGNATURE_HEADER.size:
+        return None
+    signature, _, _, start_crc, next_offset, next_size, next_crc = _SIGNATURE_HEADER.unpack(start)
+    if signature != _SIGNATURE or zlib.crc32(start[12:]) != start_crc:
+        return None
+    if next_size == 0:
+        return False  # Empty archive #
+
+    f.seek(_SIGNATURE_HEADER.size + next_offset)
+    header = f.read(min(next_size, _MAX_HEADER_READ))
+    if next_size <= _MAX_HEADER_READ and (len(header) != next_size or zlib.crc32(header) != next_crc):
+        return None
+
+    if header[0] == _K_ENCODED_HEADER:
+        # The real header is packed like file data; its coders say whether it is encrypted #
+        pack_pos, pack_sizes, folders, unpack_sizes = _read_streams_info(header, 1)
+        if any(method == _AES for folder in folders for method, _ in folder):
+            return True
+        header = _decode_header(f, pack_pos, pack_sizes, folders, unpack_sizes)
+        if header is None or header[0] != _K_HEADER:
+            return None
+
+    if header[0] != _K_HEADER:
+        return None
+    return _main_folders_encrypted(header)
+
+
+def _main_folders_encrypted(header: bytes) -> bool:
+    """Whether any folder listed in a plain kHeader uses the AES coder."""
+    pos = 1
+    if header[pos] == _K_ARCHIVE_PROPERTIES:
+        pos += 1
+        while header[pos] != _K_END:
+            size, pos = _read_number(header, pos + 1)
+            pos += size
+        pos += 1
+    if header[pos] == _K_ADDITIONAL_STREAMS_INFO:
+        raise ValueError('Additional streams are not supported')
+    if header[pos] != _K_MAIN_STREAMS_INFO:
+        return False  # No packed streams: only empty files or directories #
+    _, _, folders, _ = _read_streams_info(header, pos + 1)
+    return any(method == _AES for folder in folders for method, _ in folder)
+
+
+def _read_streams_info(buf: bytes, pos: int) -> Tuple[int, List[int], List[Folder], List[List[int]]]:
+    """
+    Parse the PackInfo and UnPackInfo parts of a StreamsInfo block.
+
+    Returns:
+        Tuple: (pack position, packed stream sizes, folders, unpack sizes per folder)
+    """
+    pack_pos, pack_sizes = 0, []
+    if buf[pos] == _K_PACK_INFO:
+        pack_pos, pos = _read_number(buf, pos + 1)
+        num_streams, pos = _read_number(buf, pos)
+        while buf[pos] != _K_END:
+            prop = buf[pos]
+            pos += 1
+            if prop == _K_SIZE:
+                for _ in range(num_streams):
+                    size, pos = _read_number(buf, pos)
+                    pack_sizes.append(size)
+            elif prop == _K_CRC:
+                pos = _skip_digests(buf, pos, num_streams)
+            else:
+                raise ValueError('Unexpected property in PackInfo')
+        pos += 1
+
+    folders, unpack_sizes = [], []
+    if buf[pos] != _K_UNPACK_INFO:
+        return pack_pos, pack_sizes, folders, unpack_sizes
+    if buf[pos + 1] != _K_FOLDER:
+        raise ValueError('Missing folder list')
+    num_folders, pos = _read_number(buf, pos + 2)
+    if buf[pos] != 0:
+        raise ValueError('External folders are not supported')
+    pos += 1
+
+    out_counts = []
+    for _ in range(num_folders):
+        num_coders, pos = _read_number(buf, pos)
+        folder = []
+        total_in = total_out = 0
+        for _ in range(num_coders):
+            flags = buf[pos]
+            id_size = flags & 0x0F
+            method = bytes(buf[pos + 1:pos + 1 + id_size])
+            pos += 1 + id_size
+            num_in = num_out = 1
+            if flags & 0x10:
+                num_in, pos = _read_number(buf, pos)
+                num_out, pos = _read_number(buf, pos)
+            props = b''
+            if flags & 0x20:
+                props_size, pos = _read_number(buf, pos)
+                props = bytes(buf[pos:pos + props_size])
+                pos += props_size
+            folder.append((method, props))
+            total_in += num_in
+            total_out += num_out
+        bind_pairs = total_out - 1
+        for _ in range(2 * bind_pairs):
+            _, pos = _read_number(buf, pos)
+        packed_streams = total_in - bind_pairs
+        if packed_streams > 1:
+            for _ in range(packed_streams):
+                _, pos = _read_number(buf, pos)
+        folders.append(folder)
+        out_counts.append(total_out)
+
+    if buf[pos] == _K_CODERS_UNPACK_SIZE:
+        pos += 1
+        for count in out_counts:
+            sizes = []
+            for _ in range(count):
+                size, pos = _read_number(buf, pos)
+                sizes.append(size)
+            unpack_sizes.append(sizes)
+    return pack_pos, pack_sizes, folders, unpack_sizes
+
+
+def _decode_header(f: BinaryIO, pack_pos: int, pack_sizes: List[int], folders: List[Folder],
+                   unpack_sizes: List[List[int]]) -> Optional[bytes]:
+    """Decompress an LZMA/LZMA2-packed header (7-Zip's default); None for anything else."""
+    if (not LZMA_AVAILABLE or len(folders) != 1 or len(folders[0]) != 1
+            or len(pack_sizes) != 1 or len(unpack_sizes) != 1):
+        return None
+    method, props = folders[0][0]
+    size = unpack_sizes[0][0]
+    if size > _MAX_DECODED_HEADER:
+        return None
+    if method == _LZMA and len(props) == 5:
+        d = props[0]
+        filters = [{
+            'id': lzma.FILTER_LZMA1, 'lc': d % 9, 'lp': (d // 9) % 5, 'pb': d // 45,
+            'dict_size': int.from_bytes(props[1:5], 'little'),
+        }]
+    elif method == _LZMA2 and len(props) == 1:
+        bits = props[0]
+        filters = [{'id': lzma.FILTER_LZMA2, 'dict_size': (2 | (bits & 1)) << (bits // 2 + 11)}]
+    else:
+        return None
+
+    f.seek(_SIGNATURE_HEADER.size + pack_pos)
+    packed = f.read(pack_sizes[0])
+    decoder = lzma.LZMADecompressor(format=lzma.FORMAT_RAW, filters=filters)
+    header = decoder.decompress(packed, max_length=size)
+    return header if len(header) == size else None
+
+
+def _skip_digests(buf: bytes, pos: int, count: int) -> int:
+    """Step over a digests record (defined-bit vector plus one CRC32 per defined item)."""
+    all_defined = buf[pos]
+    pos += 1
+    if all_defined:
+        defined = count
+    else:
+        vector_len = (count + 7) // 8
+        defined = sum(bin(b).count('1') for b in buf[pos:pos + vector_len])
+        pos += vector_len
+    return pos + 4 * defined
+
+
+def _read_number(buf: bytes, pos: int) -> Tuple[int, int]:
+    """
+    Decode a 7z variable-length number.
+
+    The count of leading one bits in the first byte gives the number of extra
+    little-endian bytes; the remaining low bits of the first byte are the high part.
+    """
+    first = buf[pos]
+    pos += 1
+    mask = 0x80
+    value = 0
+    for i in range(8):
+        if not first & mask:
+            return value | ((first & (mask - 1)) << (8 * i)), pos
+        value |= buf[pos] << (8 * i)
+        pos += 1
+        mask >>= 1
+    return value, pos
@@ -1,10 +1,12 @@
 # EncryptionProject/password_detector_package/sync_detector.py
 
-import os
 import asyncio
-from typing import Dict, List
-from .detector import PasswordProtectionDetector
-from concurrent.futures import ThreadPoolExecutor
+import os
+from typing import Dict, List, Optional, Union
+from .detector import PasswordProtectionDetector, _iter_files
+from .result_cache import ResultStore
+from .prefetcher import prefetch
+from concurrent.futures import Executor, ThreadPoolExecutor
 
 class SynchronousPasswordProtectionDetector:
     """
@@ -12,13 +14,29 @@ class SynchronousPasswordProtectionDetector:
     It processes files sequentially, one at a time, to serve as a baseline
     and contrast against the concurrent asynchronous detector.
     """
-    def __init__(self, executor: ThreadPoolExecutor):
+    def __init__(self, executor: ThreadPoolExecutor, cpu_executor: Optional[Executor] = None,
+                 result_store: Optional[ResultStore] = None):
         # The async detector is still needed to analyze individual files.
-        self._async_detector = PasswordProtectionDetector(executor=executor)
+        self._async_detector = PasswordProtectionDetector(
+            executor=executor, cpu_executor=cpu_executor, result_store=result_store
+        )
+
+    def close(self) -> None:
+        """
+        Join the handler threads of the underlying async detector.
+        """
+        self._async_detector.close()
+
+    def __enter__(self) -> 'SynchronousPasswordProtectionDetector':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
-    def analyze_file(self, file_path: str) -> Dict:
+    def analyze_file(self, file_path: Union[str, os.DirEntry]) -> Dict:
         """
         Analyze a single file for password protection and encryption in a synchronous manner.
+        Accepts a path or an os.scandir() entry, whose cached stat result is reused.
         Internally, this creates a new event loop for each file analysis.
         """
         # This part is correct: it runs one async operation and blocks until it's done.
@@ -28,13 +46,29 @@ class SynchronousPasswordProtectionDetector:
         """
         Scans all files in a directory recursively in a truly synchronous and
         sequential manner. Each file is analyzed one after the other.
+        A single event loop is reused for the whole scan.
         """
         results = []
-        for root, _, files in os.walk(directory):
-            for file in files:
-                full_path = os.path.join(root, file)
+        # One loop for every file instead of asyncio.run() creating and tearing one down per file.
+        # The shared executor is not made the loop's default: close() would shut it down, and
+        # the detector already hands it to run_in_executor itself.
+        loop = asyncio.new_event_loop()
+        try:
+            # The walk runs up to 64 files ahead on a background thread and has the kernel read
+            # upcoming files' headers while the current file is analyzed.
+            for full_path, st in prefetch(_iter_files(directory)):
                 # Analyze each file individually and sequentially.
-                # The analyze_file method blocks until its result is ready.
-                result = self.analyze_file(full_path)
+                # run_until_complete blocks until its result is ready.
+                result = loop.run_until_complete(self._async_detector.analyze_file(full_path, st))
                 results.append(result)
-        return results
\ No newline at end of file
+        finally:
+            # Finalize suspended async generators and join the default executor's threads
+            # (used by asyncio.to_thread) instead of leaving close() to abandon them.
+            # shutdown_default_executor() is missing on Python 3.8 and older uvloop.
+            try:
+                loop.run_until_complete(loop.shutdown_asyncgens())
+                if hasattr(loop, 'shutdown_default_executor'):
+                    loop.run_until_complete(loop.shutdown_default_executor())
+            finally:
+                loop.close()
+        return results
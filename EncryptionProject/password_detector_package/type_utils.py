@@ -1,27 +1,255 @@
 # EncryptionProject/password_detector_package/type_utils.py #
 
 import os
+import types
 import asyncio 
+import zipfile
+from functools import lru_cache
+from typing import Mapping, Optional, Tuple
+from .cache_utils import LRUCache, stat_key
+from .entropy_kernel import entropy_stats
 from .magika_detector import MagikaDetector
+from .zip_fast import find_entries
+from .cfbf_fast import cached_root_entry_names
+
+# Unambiguous file signatures checked before falling back to the Magika model #
+_MAGIC = (
+    (b'%PDF', 'pdf'),
+    (b'PK\x03\x04', 'zip_or_ooxml'),
+    (b'PK\x05\x06', 'zip_or_ooxml'),  # Empty archive #
+    (b'Rar!\x1a\x07', 'rar'),
+    (b'7z\xbc\xaf\x27\x1c', '7z'),
+    (b'SQLite format 3\x00', 'sqlite'),
+    (b'!BDN', 'pst'),
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'ole'),
+)
+
+# Extensions whose format is settled once the leading bytes carry one of the listed #
+# signatures; such files skip both the signature scan and the ZIP disambiguation below. #
+# A ZIP signature alone does not make an OOXML package (any archive can be renamed #
+# .docx), so those extensions only short-cut their OLE form and ZIPs named .docx go #
+# through the [Content_Types].xml lookup. ODF names are settled from the mimetype #
+# member in the header (see _known_type). Read-only, since _classify_ext() memoizes it #
+_OLE_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+_ZIP_MAGICS = (b'PK\x03\x04', b'PK\x05\x06')
+_SQLITE_MAGICS = (b'SQLite format 3\x00',)
+EXT_MAP: Mapping[str, Tuple[str, tuple]] = types.MappingProxyType({
+    '.pdf': ('pdf', (b'%PDF',)),
+    '.zip': ('zip', _ZIP_MAGICS),
+    # Password-encrypted OOXML is an OLE container holding EncryptedPackage #
+    '.docx': ('office_openxml', (_OLE_MAGIC,)),
+    '.xlsx': ('office_openxml', (_OLE_MAGIC,)),
+    '.pptx': ('office_openxml', (_OLE_MAGIC,)),
+    '.doc': ('office_legacy', (_OLE_MAGIC,)),
+    '.xls': ('office_legacy', (_OLE_MAGIC,)),
+    '.ppt': ('office_legacy', (_OLE_MAGIC,)),
+    '.7z': ('7z', (b'7z\xbc\xaf\x27\x1c',)),
+    '.rar': ('rar', (b'Rar!\x1a\x07',)),
+    '.sqlite': ('sqlite', _SQLITE_MAGICS),
+    '.db': ('sqlite', _SQLITE_MAGICS),
+    '.msg': ('msg', (_OLE_MAGIC,)),
+    '.pst': ('pst', (b'!BDN',)),
+    '.odt': ('libre_office', _ZIP_MAGICS),
+    '.ods': ('libre_office', _ZIP_MAGICS),
+    '.odp': ('libre_office', _ZIP_MAGICS),
+})
+# Plain text never reaches a format handler: Magika maps every text type to 'unknown', #
+# so a head without control bytes and with text-like entropy skips the model. Base64 #
+# (about 6 bits per byte) stays above the bound and is still classified #
+_TEXT_PROBE_SIZE = 4096
+_TEXT_MAX_ENTROPY = 5.5
+_NON_TEXT_BYTES = bytes(i for i in range(32) if i not in (9, 10, 12, 13, 27)) + b'\x7f'
+# ODF packages store an uncompressed 'mimetype' member first (local header is 30 bytes) #
+_ODF_MIMETYPE = b'mimetypeapplication/vnd.oasis.opendocument'
+_SNIFF_SIZE = 30 + len(_ODF_MIMETYPE)
+# Signature matches that _container_type() settles from the file's directory #
+_CONTAINER_TYPES = frozenset(('ole', 'zip_or_ooxml'))
+
+
+@lru_cache(maxsize=128)
+def _classify_ext(ext: str) -> Optional[Tuple[str, tuple]]:
+    """Look up EXT_MAP for a raw extension; a scan sees few distinct spellings, so this stays hot."""
+    return EXT_MAP.get(ext.lower())
+
+
+def _known_type(file_path: str, header: bytes) -> Optional[str]:
+    """Type implied by the extension when the leading bytes agree with it, else None."""
+    known = _classify_ext(os.path.splitext(file_path)[1])
+    if known is None or not header.startswith(known[1]):
+        return None
+    if known[0] == 'libre_office' and not header[30:].startswith(_ODF_MIMETYPE):
+        return None  # A plain ZIP under an ODF name; the archive checks apply #
+    return known[0]
+
+
+def _is_plain_text(header: bytes) -> bool:
+    """Whether the first 4 KiB read as text: no control bytes besides whitespace, low entropy."""
+    head = header[:_TEXT_PROBE_SIZE]
+    if not head or len(head.translate(None, _NON_TEXT_BYTES)) != len(head):
+        return False
+    return entropy_stats(head)[0] < _TEXT_MAX_ENTROPY
+
+
+def _ole_file_type(file_path: str) -> Optional[str]:
+    """Tell Outlook messages, encrypted OOXML and legacy Office apart by their root entries."""
+    names = cached_root_entry_names(file_path)
+    if names is None:
+        return None  # Left to Magika #
+    # Outlook stores message properties in __substg1.0_* streams next to a properties stream #
+    if '__properties_version1.0' in names or any(name.startswith('__substg1.0_') for name in names):
+        return 'msg'
+    # A password-protected .docx/.xlsx/.pptx is an OLE container wrapping the package #
+    if 'encryptedpackage' in names:
+        return 'office_openxml'
+    return 'office_legacy'
+
+
+def _signature_type(file_path: str, header: bytes) -> Optional[str]:
+    """
+    Identify a file from its extension and leading bytes alone, without further I/O.
+
+    Args:
+        file_path (str): Path to the file to analyze
+        header (bytes): Leading bytes of the file
+
+    Returns:
+        Optional[str]: Internal file type identifier, 'ole' or 'zip_or_ooxml' when only
+            the file's directory can settle it, or None if the signature is unknown
+    """
+    # An extension the content agrees with is conclusive; one that lies falls through #
+    file_type = _known_type(file_path, header)
+    if file_type is not None:
+        return file_type
+
+    for signature, file_type in _MAGIC:
+        if header.startswith(signature):
+            break
+    else:
+        return None
+
+    # ODF names its type in the first member; other ZIPs need the central directory #
+    if file_type == 'zip_or_ooxml' and header[30:].startswith(_ODF_MIMETYPE):
+        return 'libre_office'
+    return file_type
+
+
+def _container_type(file_path: str, file_type: str) -> Optional[str]:
+    """
+    Settle an 'ole' or 'zip_or_ooxml' signature match by reading the file's directory.
+
+    Args:
+        file_path (str): Path to the file to analyze
+        file_type (str): Result of _signature_type()
+
+    Returns:
+        Optional[str]: Internal file type identifier, or None to leave it to Magika
+    """
+    if file_type == 'ole':
+        return _ole_file_type(file_path)
+    if file_type != 'zip_or_ooxml':
+        return file_type
+
+    # Disambiguate the rest of the ZIP family: OOXML, then plain archives #
+    # A central-directory name lookup stops at the first match instead of listing every entry #
+    entries = find_entries(file_path, (b'[Content_Types].xml',))
+    if entries is not None:
+        return 'office_openxml' if entries else 'zip'
+    try:
+        with zipfile.ZipFile(file_path) as zf:
+            if '[Content_Types].xml' in zf.namelist():
+                return 'office_openxml'
+    except Exception:
+        pass
+    return 'zip'
+
+
+def _sniff_file_type(file_path: str, header: Optional[bytes] = None) -> Optional[str]:
+    """
+    Identify a file from its leading bytes.
+
+    Args:
+        file_path (str): Path to the file to analyze
+        header (Optional[bytes]): Leading bytes already read by the caller
+
+    Returns:
+        Optional[str]: Internal file type identifier, or None if the signature is unknown
+    """
+    if header is None:
+        try:
+            with open(file_path, 'rb') as f:
+                header = f.read(_SNIFF_SIZE)
+        except OSError:
+            return None
+
+    file_type = _signature_type(file_path, header)
+    if file_type is None:
+        return None
+    return _container_type(file_path, file_type)
 
 
 class FileTypeDetector:
-    """Detects file types using the Magika library."""
+    """Detects file types using magic-byte signatures, falling back to the Magika library."""
+
+    def __init__(self, cache_size: int = 65536):
+        """
+        Initialize with a Magika detector and a result cache.
 
-    def __init__(self):
-        """Initialize with a Magika detector."""
+        Args:
+            cache_size (int): Maximum number of classified files remembered.
+        """
         self.magika = MagikaDetector()
+        # Keyed by (st_dev, st_ino, st_size, st_mtime_ns) so a hard-linked or re-scanned #
+        # file is classified by the model only once #
+        self._cache = LRUCache(maxsize=cache_size)
 
-    async def detect(self, file_path: str) -> str:
+    def detect_fast(self, file_path: str, header: bytes) -> Optional[str]:
         """
-        Detect file type using Magika.
+        Detect file type from the extension and leading bytes alone, without I/O or Magika.
+
+        Cheap enough to run on the event loop and not worth caching; detect() covers
+        the files it cannot settle.
+
+        Args:
+            file_path (str): Path to the file to analyze
+            header (bytes): File prefix already read by the caller
+
+        Returns:
+            Optional[str]: Internal file type identifier, or None if the extension is
+                unknown or the content disagrees with it
+        """
+        return _known_type(file_path, header)
+
+    async def detect(self, file_path: str, st: Optional[os.stat_result] = None,
+                     header: Optional[bytes] = None) -> str:
+        """
+        Detect file type from its signature, or with Magika when the signature is unknown.
         
         Args:
             file_path (str): Path to the file to analyze
+            st (Optional[os.stat_result]): Stat result if already known by the caller
+            header (Optional[bytes]): File prefix if already read by the caller
             
         Returns:
             str: Internal file type identifier (e.g., 'pdf', 'zip')
         """
-       
-        file_type = await self.magika.detect(file_path) # Await the async call #
+        try:
+            key = stat_key(file_path, st)
+        except OSError:
+            return await self.magika.detect(file_path)
+
+        file_type = self._cache.get(key)
+        if file_type is None:
+            if header is not None:
+                # Only the byte match runs on the loop; the ZIP and OLE directory reads #
+                # go to a thread, which sees this analysis' ole_cache #
+                file_type = _signature_type(file_path, header)
+                if file_type in _CONTAINER_TYPES:
+                    file_type = await asyncio.to_thread(_container_type, file_path, file_type)
+            else:
+                file_type = await asyncio.to_thread(_sniff_file_type, file_path, header)
+            if file_type is None and header is not None and _is_plain_text(header):
+                file_type = 'unknown'
+            if file_type is None:
+                file_type = await self.magika.detect(file_path) # Await the async call #
+            self._cache.put(key, file_type)
         return file_type
@@ -0,0 +1,279 @@
+# EncryptionProject/password_detector_package/zip_fast.py #
+
+import os
+import struct
+import zlib
+from typing import BinaryIO, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+# The _zipscan C extension (built by setup.py when a compiler is present) runs the flag #
+# walk without per-entry interpreter work; the Python loop below is the fallback #
+try:
+    from ._zipscan import encryption_flag as _c_encryption_flag
+    ZIPSCAN_AVAILABLE = True
+except ImportError:
+    ZIPSCAN_AVAILABLE = False
+
+# Minimal ZIP central-directory reader. Encryption checks only need the general #
+# purpose flag of each entry, so this skips zipfile's per-entry ZipInfo objects #
+
+_EOCD_SIG = b'PK\x05\x06'
+_CDH_SIG = b'PK\x01\x02'
+_EOCD = struct.Struct('<4s4H2LH')   # End of central directory record (22 bytes) #
+_EOCD64_SIG = b'PK\x06\x06'
+_EOCD64_LOC_SIG = b'PK\x06\x07'
+_EOCD64 = struct.Struct('<4sQ2H2L4Q')    # ZIP64 end of central directory record (56 bytes) #
+_EOCD64_LOC_SIZE = 20                   # ZIP64 locator that sits right before the EOCD #
+_CDH_SIZE = 46                      # Fixed part of a central directory header #
+# Signature, general purpose flags (offset 8) and name/extra/comment lengths (offset 28) #
+# of a central directory header, in one unpack #
+_CDH_WALK = struct.Struct('<4s4xH18x3H')
+# Compression method (offset 10), compressed size (20) and local header offset (42) #
+_CDH_LOCATION = struct.Struct('<H8xL18xL')
+_LFH_SIG = b'PK\x03\x04'
+_LFH_SIZE = 30                      # Fixed part of a local file header #
+_LFH_LENGTHS = struct.Struct('<2H') # Name and extra lengths at offset 26 #
+_STORED = 0
+_DEFLATED = 8
+_MAX_COMMENT = 0xFFFF
+
+Source = Union[str, os.PathLike, BinaryIO]
+
+
+def read_central_directory(source: Source) -> Optional[bytes]:
+    """
+    Read the raw central directory of a ZIP file.
+
+    Args:
+        source (Source): Path to the archive, or a seekable binary file object that the
+                         caller keeps open (and may hand on to zipfile.ZipFile afterwards).
+
+    Returns:
+        Optional[bytes]: Central directory bytes, or None if no valid EOCD record is found.
+    """
+    try:
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f:
+                located = _locate_central_directory(f)
+        else:
+            located = _locate_central_directory(source)
+    except OSError:
+        return None
+    return located[0] if located is not None else None
+
+
+def _locate_central_directory(f: BinaryIO) -> Optional[Tuple[bytes, int]]:
+    """Read the central directory and the shift of recorded offsets (prepended data)."""
+    cd, cd_size, base = _read_central_directory(f)
+    if cd is None or len(cd) != cd_size or (cd and not cd.startswith(_CDH_SIG)):
+        return None
+    return cd, base
+
+
+def _read_central_directory(f: BinaryIO) -> Tuple[Optional[bytes], int, int]:
+    f.seek(0, 2)
+    size = f.tell()
+    tail_len = min(size, _EOCD.size + _MAX_COMMENT)
+    f.seek(size - tail_len)
+    tail = f.read(tail_len)
+
+    # The real EOCD is the one whose comment length reaches exactly to end of file #
+    pos = tail.rfind(_EOCD_SIG)
+    while pos >= 0:
+        if len(tail) - pos >= _EOCD.size and _EOCD.unpack_from(tail, pos)[7] == len(tail) - pos - _EOCD.size:
+            break
+        pos = tail.rfind(_EOCD_SIG, 0, pos)
+    if pos < 0:
+        return None, 0, 0
+    entries, cd_size, cd_offset = _EOCD.unpack_from(tail, pos)[4:7]
+    record_start = size - tail_len + pos
+    # Writers may add the ZIP64 records even when no EOCD field overflowed, so the #
+    # locator right before the EOCD counts as well as the overflow markers #
+    has_locator = pos >= _EOCD64_LOC_SIZE and tail.startswith(_EOCD64_LOC_SIG, pos - _EOCD64_LOC_SIZE)
+    if has_locator or cd_offset == 0xFFFFFFFF or cd_size == 0xFFFFFFFF or entries == 0xFFFF:
+        # ZIP64: the real sizes live in the ZIP64 record in front of the locator #
+        record_start -= _EOCD64_LOC_SIZE + _EOCD64.size
+        if record_start < 0:
+            return None, 0, 0
+        f.seek(record_start)
+        record = f.read(_EOCD64.size + _EOCD64_LOC_SIZE)
+        if (len(record) != _EOCD64.size + _EOCD64_LOC_SIZE or not record.startswith(_EOCD64_SIG)
+                or record[_EOCD64.size:_EOCD64.size + 4] != _EOCD64_LOC_SIG):
+            return None, 0, 0
+        cd_size, cd_offset = _EOCD64.unpack_from(record)[8:10]
+
+    # Locate the directory relative to the EOCD so archives with prepended data work #
+    cd_start = record_start - cd_size
+    if cd_start < 0:
+        return None, 0, 0
+    f.seek(cd_start)
+    return f.read(cd_size), cd_size, cd_start - cd_offset
+
+
+def iter_central_directory(cd: bytes) -> Iterator[Tuple[int, bytes]]:
+    """
+    Walk central directory headers lazily.
+
+    Args:
+        cd (bytes): Raw central directory as returned by read_central_directory.
+
+    Yields:
+        Tuple[int, bytes]: (general purpose flag bits, raw entry name) per entry.
+
+    Raises:
+        ValueError: If a header is truncated or its signature does not match.
+    """
+    pos = 0
+    end = len(cd)
+    unpack = _CDH_WALK.unpack_from
+    while pos < end:
+        if pos + _CDH_SIZE > end:
+            raise ValueError('Malformed ZIP central directory')
+        signature, flags, name_len, extra_len, comment_len = unpack(cd, pos)
+        if signature != _CDH_SIG:
+            raise ValueError('Malformed ZIP central directory')
+        name_start = pos + _CDH_SIZE
+        yield flags, cd[name_start:name_start + name_len]
+        pos = name_start + name_len + extra_len + comment_len
+
+
+def zip_encryption_flag(source: Source) -> Optional[bool]:
+    """
+    Check whether any entry of a ZIP archive has the encryption bit set.
+
+    Args:
+        source (Source): Path to the archive or an open binary file object.
+
+    Returns:
+        Optional[bool]: True on the first encrypted entry, False if none is encrypted,
+                        None if the central directory could not be parsed.
+    """
+    cd = read_central_directory(source)
+    if cd is None:
+        return None
+    if ZIPSCAN_AVAILABLE:
+        return _c_encryption_flag(cd)
+    # Same walk as iter_central_directory, inlined: names are never sliced out and no #
+    # generator frame is resumed per entry #
+    pos = 0
+    end = len(cd)
+    unpack = _CDH_WALK.unpack_from
+    while pos < end:
+        if pos + _CDH_SIZE > end:
+            return None
+        signature, flags, name_len, extra_len, comment_len = unpack(cd, pos)
+        if signature != _CDH_SIG:
+            return None
+        if flags & 0x1:
+            return True
+        pos += _CDH_SIZE + name_len + extra_len + comment_len
+    return False
+
+
+def find_entries(source: Source, names: Iterable[bytes]) -> Optional[Dict[bytes, int]]:
+    """
+    Look up specific entry names in a ZIP archive's central directory.
+
+    Args:
+        source (Source): Path to the archive or an open binary file object.
+        names (Iterable[bytes]): Raw entry names to look for (e.g. b'EncryptedPackage').
+
+    Returns:
+        Optional[Dict[bytes, int]]: General purpose flag bits of each requested entry that
+                                    exists, or None if the central directory could not be parsed.
+                                    The walk stops as soon as every name has been found.
+    """
+    cd = read_central_directory(source)
+    if cd is None:
+        return None
+    wanted = set(names)
+    found = {}
+    try:
+        for flags, name in iter_central_directory(cd):
+            if name in wanted:
+                found[name] = flags
+                if len(found) == len(wanted):
+                    break
+    except ValueError:
+        return None
+    return found
+
+
+# (general purpose flags, compression method, compressed size, local header offset) #
+EntryRecord = Tuple[int, int, int, int]
+
+
+def find_entry_records(f: BinaryIO, names: Iterable[bytes]) -> Optional[Dict[bytes, EntryRecord]]:
+    """
+    Look up specific entries of a ZIP archive along with where their data is stored.
+
+    Args:
+        f (BinaryIO): Open binary file object of the archive, later passed to read_entry.
+        names (Iterable[bytes]): Raw entry names to look for (e.g. b'META-INF/manifest.xml').
+
+    Returns:
+        Optional[Dict[bytes, EntryRecord]]: Record of each requested entry that exists, or
+                                            None if the central directory could not be parsed.
+    """
+    located = _locate_central_directory(f)
+    if located is None:
+        return None
+    cd, base = located
+    wanted = set(names)
+    found = {}
+    pos = 0
+    end = len(cd)
+    while pos < end and len(found) < len(wanted):
+        if pos + _CDH_SIZE > end:
+            return None
+        signature, flags, name_len, extra_len, comment_len = _CDH_WALK.unpack_from(cd, pos)
+        if signature != _CDH_SIG:
+            return None
+        name = cd[pos + _CDH_SIZE:pos + _CDH_SIZE + name_len]
+        if name in wanted:
+            method, compressed_size, header_offset = _CDH_LOCATION.unpack_from(cd, pos + 10)
+            # A ZIP64 entry keeps its real offset in the extra field; -1 marks it unsupported #
+            found[name] = (flags, method, compressed_size,
+                           header_offset + base if header_offset != 0xFFFFFFFF else -1)
+        pos += _CDH_SIZE + name_len + extra_len + comment_len
+    return found
+
+
+def read_entry(f: BinaryIO, record: EntryRecord, max_size: int) -> Optional[bytes]:
+    """
+    Read and decompress one small entry without building a zipfile.ZipFile.
+
+    Args:
+        f (BinaryIO): Open binary file object of the archive.
+        record (EntryRecord): The entry's record from find_entry_records.
+        max_size (int): Largest decompressed size accepted.
+
+    Returns:
+        Optional[bytes]: The entry's content, or None if it is encrypted, ZIP64, larger
+                         than max_size, stored with another method or damaged.
+    """
+    flags, method, compressed_size, header_offset = record
+    # Deflate never makes data larger by much, so a compressed size past the limit is #
+    # also rejected up front (this covers the ZIP64 size marker as well) #
+    if flags & 0x1 or method not in (_STORED, _DEFLATED) or header_offset < 0 or compressed_size > max_size:
+        return None
+    try:
+        f.seek(header_offset)
+        header = f.read(_LFH_SIZE)
+        if len(header) != _LFH_SIZE or not header.startswith(_LFH_SIG):
+            return None
+        name_len, extra_len = _LFH_LENGTHS.unpack_from(header, 26)
+        f.seek(header_offset + _LFH_SIZE + name_len + extra_len)
+        data = f.read(compressed_size)
+        if len(data) != compressed_size:
+            return None
+        if method == _STORED:
+            return data
+        # Raw deflate stream; max_length stops a decompression bomb at the size limit #
+        decompressor = zlib.decompressobj(-15)
+        content = decompressor.decompress(data, max_size)
+        if decompressor.unconsumed_tail or not decompressor.eof:
+            return None
+        return content
+    except (OSError, zlib.error):
+        return None
+
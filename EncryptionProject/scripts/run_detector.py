@@ -5,10 +5,78 @@ import sys
 import time
 import asyncio
 import argparse
+import contextlib
+import sqlite3
 import multiprocessing
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from password_detector_package.detector import PasswordProtectionDetector
 from password_detector_package.sync_detector import SynchronousPasswordProtectionDetector
+from password_detector_package.result_cache import ResultStore
+
+# uvloop is an optional, faster drop-in event loop (not available on Windows) #
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+
+# Result lines are collected and written in chunks of this many bytes, not one write per file #
+_OUT_FLUSH_SIZE = 65536
+# ...or after this many seconds, so a long scan shows progress before a chunk fills #
+_OUT_FLUSH_INTERVAL = 0.1
+
+
+class _ResultWriter:
+    """Formats analysis results as stdout lines and writes them in batches."""
+
+    def __init__(self):
+        # Text printed before the first result (the mode banner) must come out first #
+        sys.stdout.flush()
+        self._out = sys.stdout.buffer
+        self._buf = bytearray()
+        self._last_write = time.perf_counter()
+
+    def add(self, result):
+        """
+        Queue one result line, writing the batch once it is large or old enough.
+
+        Args:
+            result (Dict): Result as returned by the detectors.
+        """
+        if not result:
+            return
+        status = "PASSWORD PROTECTED" if result['password_protected'] else "NOT PASSWORD PROTECTED"
+        output_line = (
+            f"{result['file']}: {status} "
+            f"(Encrypted: {result['encrypted']}, "
+            f"Confidence: {result['confidence']:.2f}, "
+            f"Time: {result['duration']:.4f}s)\n"
+        )
+        self._buf.extend(output_line.encode('utf-8', errors='replace'))
+        if len(self._buf) > _OUT_FLUSH_SIZE or time.perf_counter() - self._last_write > _OUT_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        """Write every queued line to stdout."""
+        if self._buf:
+            self._out.write(self._buf)
+            self._out.flush()
+            self._buf.clear()
+        self._last_write = time.perf_counter()
+
+
+def _write_results(results):
+    """
+    Write one line per analysis result to stdout in batched writes.
+
+    Args:
+        results (Iterable[Dict]): Results as returned by the detectors.
+    """
+    writer = _ResultWriter()
+    for result in results:
+        writer.add(result)
+    writer.flush()
 
 
 def main_cli():
@@ -33,60 +101,104 @@ def main_cli():
         action='store_true',
         help='Run in synchronous mode (uses a synchronous wrapper around the async core)'
     )
+    parser.add_argument(
+        '--cpu-workers',
+        type=int,
+        default=0,
+        metavar='N',
+        help='Run entropy scoring and PDF/7z checks in N worker processes to use all cores (default: 0, in-process)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=0,
+        metavar='N',
+        help='I/O threads and concurrent analyses (default: $DETECTOR_WORKERS, else 256 with --batch)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read or update the on-disk result cache ($DETECTOR_CACHE, else ~/.cache/password_detector)'
+    )
     args = parser.parse_args()
 
+    try:
+        env_workers = int(os.environ.get('DETECTOR_WORKERS', '0'))
+    except ValueError:
+        parser.error('DETECTOR_WORKERS must be an integer')
+
+    # Threads spend most of their time blocked on open/read, so batch scans default #
+    # well above the CPU-based heuristic #
     num_cpu_cores = multiprocessing.cpu_count()
-    max_workers = max(32, num_cpu_cores * 2 + 4) 
+    max_workers = args.workers or env_workers or (256 if args.batch else max(32, num_cpu_cores * 2 + 4))
     
-    with ThreadPoolExecutor(max_workers=max_workers) as global_executor:
+    cpu_pool = ProcessPoolExecutor(max_workers=args.cpu_workers) if args.cpu_workers > 0 else contextlib.nullcontext()
+
+    # Unchanged files are answered from earlier runs' verdicts; a cache that cannot be #
+    # opened (read-only home, locked database) only disables the speed-up #
+    store = contextlib.nullcontext()
+    if not args.no_cache:
+        try:
+            store = ResultStore()
+        except (OSError, sqlite3.Error) as e:
+            sys.stderr.buffer.write(f"Warning: result cache disabled ({e}).\n".encode('utf-8', errors='replace'))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as global_executor, cpu_pool as cpu_executor, \
+            store as result_store:
         if args.sync:
             print("Running in explicit SYNCHRONOUS mode (using SynchronousPasswordProtectionDetector)...")
-            detector = SynchronousPasswordProtectionDetector(executor=global_executor)
-            
-            if args.batch and os.path.isdir(args.path):
-                results = detector.scan_directory(args.path)
-            elif os.path.isfile(args.path):
-                results = [detector.analyze_file(args.path)]
-            else:
-                sys.stderr.buffer.write(b"Error: Invalid path provided.\n")
-                results = [] 
+            # Closing the detector joins its handler threads before the executor shuts down #
+            with SynchronousPasswordProtectionDetector(
+                executor=global_executor, cpu_executor=cpu_executor, result_store=result_store
+            ) as detector:
+                if args.batch and os.path.isdir(args.path):
+                    results = detector.scan_directory(args.path)
+                elif os.path.isfile(args.path):
+                    results = [detector.analyze_file(args.path)]
+                else:
+                    sys.stderr.buffer.write(b"Error: Invalid path provided.\n")
+                    results = [] 
             
-            for result in results:
-                if result:
-                    status = "PASSWORD PROTECTED" if result['password_protected'] else "NOT PASSWORD PROTECTED"
-                    output_line = (
-                        f"{result['file']}: {status} "
-                        f"(Encrypted: {result['encrypted']}, "
-                        f"Confidence: {result['confidence']:.2f}, "
-                        f"Time: {result['duration']:.4f}s)\n"
-                    )
-                    sys.stdout.buffer.write(output_line.encode('utf-8', errors='replace'))
+            _write_results(results)
 
         else:
             print("Running in ASYNCHRONOUS mode (using PasswordProtectionDetector)...")
-            detector = PasswordProtectionDetector(executor=global_executor)
+            detector = PasswordProtectionDetector(
+                executor=global_executor, max_workers=max_workers, cpu_executor=cpu_executor,
+                result_store=result_store
+            )
             
             async def _run_async_logic():
+                # Results are written as they complete instead of after the whole scan #
+                writer = _ResultWriter()
                 if args.batch and os.path.isdir(args.path):
-                    return await detector.scan_directory(args.path)
+                    results = detector.iter_directory(args.path)
+                    try:
+                        async for result in results:
+                            writer.add(result)
+                    finally:
+                        await results.aclose()
                 elif os.path.isfile(args.path):
-                    return [await detector.analyze_file(args.path)]
+                    writer.add(await detector.analyze_file(args.path))
                 else:
                     sys.stderr.buffer.write(b"Error: Invalid path provided.\n")
-                    return []
+                writer.flush()
 
-            results = asyncio.run(_run_async_logic())
-            
-            for result in results:
-                if result:
-                    status = "PASSWORD PROTECTED" if result['password_protected'] else "NOT PASSWORD PROTECTED"
-                    output_line = (
-                        f"{result['file']}: {status} "
-                        f"(Encrypted: {result['encrypted']}, "
-                        f"Confidence: {result['confidence']:.2f}, "
-                        f"Time: {result['duration']:.4f}s)\n"
-                    )
-                    sys.stdout.buffer.write(output_line.encode('utf-8', errors='replace'))
+            # One loop for the whole run. global_executor is not made its default executor, #
+            # since close() would shut it down; the detector passes it explicitly #
+            loop = uvloop.new_event_loop() if UVLOOP_AVAILABLE else asyncio.new_event_loop()
+            try:
+                loop.run_until_complete(_run_async_logic())
+            finally:
+                # Finalize suspended async generators and join the default executor's threads #
+                # before closing; shutdown_default_executor() needs Python 3.9+ / uvloop 0.15+ #
+                try:
+                    loop.run_until_complete(loop.shutdown_asyncgens())
+                    if hasattr(loop, 'shutdown_default_executor'):
+                        loop.run_until_complete(loop.shutdown_default_executor())
+                finally:
+                    loop.close()
+                    detector.close()
 
 
     total_end_time = time.perf_counter()
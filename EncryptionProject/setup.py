@@ -0,0 +1,38 @@
+# EncryptionProject/setup.py #
+
+from setuptools import setup, Extension
+from setuptools.command.build_ext import build_ext
+
+# Project metadata lives in pyproject.toml; this file only declares the optional C accelerators. #
+# optional=True lets installs without a compiler succeed and use the Numba/NumPy/Python code instead #
+
+# GCC/Clang flags so the histogram and accumulation loops are unrolled and vectorized. #
+# -march=native is deliberately left out: it would make built wheels CPU-specific #
+_UNIX_COMPILE_ARGS = ["-O3", "-funroll-loops"]
+
+
+class _OptimizedBuildExt(build_ext):
+    """Adds optimization flags for GCC-style compilers; MSVC keeps its defaults."""
+
+    def build_extensions(self):
+        if self.compiler.compiler_type == "unix":
+            for ext in self.extensions:
+                ext.extra_compile_args = _UNIX_COMPILE_ARGS + list(ext.extra_compile_args or [])
+        super().build_extensions()
+
+
+setup(
+    ext_modules=[
+        Extension(
+            "password_detector_package._shannon",
+            sources=["password_detector_package/_shannon.c"],
+            optional=True,
+        ),
+        Extension(
+            "password_detector_package._zipscan",
+            sources=["password_detector_package/_zipscan.c"],
+            optional=True,
+        ),
+    ],
+    cmdclass={"build_ext": _OptimizedBuildExt},
+)
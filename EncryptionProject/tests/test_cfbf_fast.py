@@ -0,0 +1,154 @@
+# EncryptionProject/tests/test_cfbf_fast.py #
+
+import io
+import struct
+import zipfile
+
+import pytest
+
+from password_detector_package.cfbf_fast import root_entry_names
+
+olefile = pytest.importorskip('olefile')
+
+# Plain compound files are assembled here (one FAT sector, a directory chain, empty #
+# streams); encrypted OOXML comes from msoffcrypto. Both are judged against olefile #
+
+_FREE = 0xFFFFFFFF
+_END_OF_CHAIN = 0xFFFFFFFE
+_FAT_SECTOR = 0xFFFFFFFD
+_NOSTREAM = 0xFFFFFFFF
+_ROOT, _STORAGE, _STREAM = 5, 1, 2
+_NAMES = ['WordDocument', '\x05SummaryInformation', '1Table', 'Data', 'ObjectPool',
+          'CompObj', 'Macros', 'Workbook', 'PowerPoint Document']
+
+
+def _entry(name, entry_type, left=_NOSTREAM, right=_NOSTREAM, child=_NOSTREAM):
+    encoded = (name + '\0').encode('utf-16-le')
+    return (encoded.ljust(64, b'\0')
+            + struct.pack('<HBB3L', len(encoded), entry_type, 1, left, right, child)
+            + b'\0' * 16 + struct.pack('<LQQ', 0, 0, 0)
+            + struct.pack('<LQ', _END_OF_CHAIN, 0))
+
+
+def _tree(sids):
+    """Link sibling ids into a balanced binary tree; returns (root id, {id: (left, right)})."""
+    if not sids:
+        return _NOSTREAM, {}
+    middle = len(sids) // 2
+    left, left_links = _tree(sids[:middle])
+    right, right_links = _tree(sids[middle + 1:])
+    return sids[middle], {sids[middle]: (left, right), **left_links, **right_links}
+
+
+def _cfbf(names=_NAMES, nested=(), sector_shift=9, dir_order=None):
+    """
+    Build a compound file whose root holds the given streams, plus one storage
+    holding nested streams when any are given.
+    """
+    sector_size = 1 << sector_shift
+    specs = [(name, _STREAM) for name in names]
+    if nested:
+        specs.append(('Storage', _STORAGE))
+    top = list(range(1, len(specs) + 1))
+    inner = list(range(len(specs) + 1, len(specs) + 1 + len(nested)))
+    top_root, links = _tree(top)
+    inner_root, inner_links = _tree(inner)
+    links.update(inner_links)
+
+    entries = [_entry('Root Entry', _ROOT, child=top_root)]
+    for sid, (name, entry_type) in zip(top, specs):
+        child = inner_root if entry_type == _STORAGE else _NOSTREAM
+        entries.append(_entry(name, entry_type, *links[sid], child=child))
+    for sid, name in zip(inner, nested):
+        entries.append(_entry(name, _STREAM, *links[sid]))
+    per_sector = sector_size // 128
+    while len(entries) % per_sector:
+        entries.append(b'\0' * 128)
+    chunks = [b''.join(entries[i:i + per_sector]) for i in range(0, len(entries), per_sector)]
+
+    # Sector 0 is the FAT; directory chunk i lives in sector dir_order[i] #
+    dir_order = dir_order or list(range(1, len(chunks) + 1))
+    fat = [_FREE] * (sector_size // 4)
+    fat[0] = _FAT_SECTOR
+    for current, following in zip(dir_order, dir_order[1:] + [_END_OF_CHAIN]):
+        fat[current] = following
+    sectors = [b''] * (len(chunks) + 1)
+    sectors[0] = struct.pack(f'<{len(fat)}L', *fat)
+    for sector, chunk in zip(dir_order, chunks):
+        sectors[sector] = chunk
+
+    major = 4 if sector_shift == 12 else 3
+    header = struct.pack('<8s16s5H6s9L', b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', b'\0' * 16,
+                         0x3E, major, 0xFFFE, sector_shift, 6, b'\0' * 6,
+                         len(chunks) if major == 4 else 0, 1, dir_order[0], 0, 4096,
+                         _END_OF_CHAIN, 0, _END_OF_CHAIN, 0)
+    header += struct.pack('<109L', 0, *[_FREE] * 108)
+    return header.ljust(sector_size, b'\0') + b''.join(sectors)
+
+
+def _library_root_names(data):
+    with olefile.OleFileIO(io.BytesIO(data)) as ole:
+        return frozenset(path[0].lower() for path in ole.listdir(streams=True, storages=True))
+
+
+@pytest.mark.parametrize('kwargs', [
+    {},
+    {'names': ['WordDocument']},
+    {'names': []},
+    {'sector_shift': 12},
+    {'dir_order': [3, 1, 2]},
+    {'names': _NAMES[:3], 'nested': ['EncryptionInfo', 'EncryptedPackage']},
+], ids=['plain', 'single', 'empty', 'sector_4096', 'scattered_directory', 'nested_storage'])
+def test_matches_library(kwargs):
+    data = _cfbf(**kwargs)
+    names = root_entry_names(io.BytesIO(data))
+    assert names == _library_root_names(data)
+    if 'nested' in kwargs:
+        assert 'encryptioninfo' not in names  # Only entries directly under the root count #
+
+
+def test_encrypted_ooxml_matches_library(tmp_path):
+    msoffcrypto = pytest.importorskip('msoffcrypto')
+    plain = io.BytesIO()
+    with zipfile.ZipFile(plain, 'w') as package:
+        package.writestr('[Content_Types].xml',
+                         '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types"/>')
+        package.writestr('word/document.xml', '<w:document/>')
+    plain.seek(0)
+    path = tmp_path / 'protected.docx'
+    with open(path, 'wb') as out:
+        msoffcrypto.OfficeFile(plain).encrypt('pw', out)
+
+    names = root_entry_names(str(path))
+    assert names == _library_root_names(path.read_bytes())
+    assert {'encryptioninfo', 'encryptedpackage'} <= names
+
+
+def test_truncated_is_unreadable():
+    data = _cfbf()
+    for cut in (len(data) - 1, 512 + 512, 512, 100, 0):
+        assert root_entry_names(io.BytesIO(data[:cut])) is None
+
+
+def test_malformed_headers_are_unreadable():
+    data = bytearray(_cfbf())
+    for offset, value in ((28, b'\xff\xff'), (30, b'\x07\x00'), (0, b'\0')):
+        broken = bytearray(data)
+        broken[offset:offset + len(value)] = value  # Byte order, sector shift, signature #
+        assert root_entry_names(io.BytesIO(bytes(broken))) is None
+
+
+def test_directory_loops_terminate():
+    # A FAT chain that points back at itself is cut off instead of looping #
+    data = bytearray(_cfbf(names=['WordDocument']))
+    struct.pack_into('<L', data, 512 + 4, 1)
+    assert root_entry_names(io.BytesIO(bytes(data))) is None
+
+    # A sibling pointing back at its parent (entry 2, the subtree root) is visited once #
+    data = bytearray(_cfbf(names=['WordDocument', 'Data', 'CompObj']))
+    struct.pack_into('<L', data, 1024 + 3 * 128 + 0x44, 2)
+    assert root_entry_names(io.BytesIO(bytes(data))) == {'worddocument', 'data', 'compobj'}
+
+
+def test_not_a_compound_file():
+    assert root_entry_names(io.BytesIO(b'PK\x03\x04' + b'\0' * 1024)) is None
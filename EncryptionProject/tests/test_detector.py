@@ -0,0 +1,95 @@
+# EncryptionProject/tests/test_detector.py #
+
+import asyncio
+import os
+import random
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from password_detector_package.detector import DEDUP_MIN_SIZE, PasswordProtectionDetector, _EntropyBatcher
+from password_detector_package.entropy import EntropyAnalyzer
+
+
+def _write_archive(path, encrypt_last):
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.writestr('big.bin', b'\x00' * (2 * DEDUP_MIN_SIZE), compress_type=zipfile.ZIP_STORED)
+        zf.writestr('last.txt', b'y' * 64, compress_type=zipfile.ZIP_STORED)
+        last = zf.getinfo('last.txt')
+    if encrypt_last:
+        # Set the encryption bit of the last member in its local and central headers #
+        data = bytearray(path.read_bytes())
+        data[last.header_offset + 6] |= 1
+        central = data.rindex(b'PK\x01\x02')
+        data[central + 8] |= 1
+        path.write_bytes(bytes(data))
+    return str(path)
+
+
+def test_dedup_tells_apart_archives_differing_past_the_head(tmp_path):
+    plain = _write_archive(tmp_path / 'a.zip', encrypt_last=False)
+    locked = _write_archive(tmp_path / 'b.zip', encrypt_last=True)
+    assert (tmp_path / 'a.zip').stat().st_size == (tmp_path / 'b.zip').stat().st_size
+
+    async def main():
+        with ThreadPoolExecutor(2) as executor:
+            detector = PasswordProtectionDetector(executor)
+            return await detector.analyze_file(plain), await detector.analyze_file(locked)
+
+    first, second = asyncio.run(main())
+    assert not first['encrypted']
+    assert second['encrypted'] and second['confidence'] == 1.0
+
+
+def _entropy_files(tmp_path):
+    rng = random.Random(7)
+    contents = {
+        'random.bin': os.urandom(8192),
+        'cipher.enc': os.urandom(5000),
+        'zeros.dat': bytes(8192),
+        'text.bin': b'the quick brown fox jumps over the lazy dog\n' * 150,
+        'low.zip': bytes(rng.choice(b'abcd') for _ in range(3001)),
+        'tiny.bin': b'\x01\x02\x03',
+    }
+    paths = []
+    for name, data in contents.items():
+        path = tmp_path / name
+        path.write_bytes(data)
+        paths.append(str(path))
+    return paths
+
+
+@pytest.mark.parametrize('cpu_executor', [False, True])
+def test_batched_scores_match_per_file_analysis(tmp_path, cpu_executor):
+    paths = _entropy_files(tmp_path)
+    expected = [EntropyAnalyzer.analyze(path) for path in paths]
+
+    async def main():
+        with ThreadPoolExecutor(1) as executor:
+            batcher = _EntropyBatcher(executor if cpu_executor else None)
+            samples = [open(path, 'rb').read(8192) for path in paths]
+            exts = [os.path.splitext(path)[1] for path in paths]
+            return await asyncio.gather(*(batcher.score(d, e) for d, e in zip(samples, exts)))
+
+    for (encrypted, confidence), (want_encrypted, want_confidence) in zip(asyncio.run(main()), expected):
+        assert encrypted == want_encrypted
+        assert confidence == pytest.approx(want_confidence, abs=1e-9)
+
+
+def test_cancelled_batch_releases_waiters():
+    release = threading.Event()
+
+    async def main():
+        executor = ThreadPoolExecutor(1)
+        executor.submit(release.wait)  # Occupies the only worker, so the batch stays queued #
+        batcher = _EntropyBatcher(executor)
+        waiter = batcher.score(os.urandom(1024), '.bin')
+        await asyncio.sleep(0.05)
+        executor.shutdown(wait=False, cancel_futures=True)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(waiter, 5)
+
+    asyncio.run(main())
@@ -0,0 +1,152 @@
+# EncryptionProject/tests/test_dispatcher.py #
+
+import asyncio
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from password_detector_package import file_handlers
+from password_detector_package.detector import PasswordProtectionDetector
+from password_detector_package.file_handlers import BlockingDispatcher, handler_dispatcher
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+async def _submit(dispatcher, fn, *args):
+    return await dispatcher.submit(fn, *args)
+
+
+def test_results_and_exceptions():
+    dispatcher = BlockingDispatcher(2)
+
+    async def main():
+        assert await dispatcher.submit(sum, (1, 2)) == 3
+        with pytest.raises(KeyError):
+            await dispatcher.submit({}.__getitem__, 'missing')
+
+    _run(main())
+
+
+def test_thread_count_is_bounded():
+    dispatcher = BlockingDispatcher(3)
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def work():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+
+    async def main():
+        await asyncio.gather(*(dispatcher.submit(work) for _ in range(20)))
+
+    _run(main())
+    assert peak[0] <= 3
+    assert dispatcher._threads <= 3
+
+
+def test_context_is_copied():
+    dispatcher = BlockingDispatcher(1)
+
+    async def main():
+        handler_dispatcher.set(dispatcher)
+        return await dispatcher.submit(handler_dispatcher.get)
+
+    assert _run(main()) is dispatcher
+
+
+def test_idle_threads_exit(monkeypatch):
+    monkeypatch.setattr(file_handlers, '_DISPATCH_IDLE_TIMEOUT', 0.05)
+    dispatcher = BlockingDispatcher(4)
+
+    async def main():
+        await asyncio.gather(*(dispatcher.submit(time.sleep, 0.02) for _ in range(4)))
+
+    _run(main())
+    deadline = time.monotonic() + 5
+    while dispatcher._threads and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert dispatcher._threads == 0
+    # A retired pool starts threads again on demand #
+    assert _run(_submit(dispatcher, abs, -1)) == 1
+
+
+def test_burst_past_max_threads_then_retirement(monkeypatch):
+    monkeypatch.setattr(file_handlers, '_DISPATCH_IDLE_TIMEOUT', 0.05)
+    dispatcher = BlockingDispatcher(1)
+
+    async def main():
+        await asyncio.gather(*(dispatcher.submit(time.sleep, 0.01) for _ in range(5)))
+
+    _run(main())
+    deadline = time.monotonic() + 5
+    while dispatcher._threads and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert dispatcher._threads == 0
+    assert dispatcher._idle == 0 and dispatcher._backlog == 0
+
+    # Queued jobs must not leave idle slots behind that a later submit trusts #
+    async def after():
+        return await asyncio.wait_for(dispatcher.submit(abs, -1), 5)
+
+    assert _run(after()) == 1
+
+
+def test_detector_bounds_handler_threads(tmp_path, monkeypatch):
+    for i in range(24):
+        with zipfile.ZipFile(tmp_path / f'{i}.zip', 'w') as zf:
+            zf.writestr('a.txt', 'x' * 100)
+
+    names, lock = set(), threading.Lock()
+    flag = file_handlers.zip_encryption_flag
+
+    def recording_flag(f):
+        with lock:
+            names.add(threading.current_thread().name)
+        time.sleep(0.01)
+        return flag(f)
+
+    monkeypatch.setattr(file_handlers, 'zip_encryption_flag', recording_flag)
+
+    async def main():
+        with ThreadPoolExecutor(8) as executor:
+            detector = PasswordProtectionDetector(executor, max_workers=2)
+            paths = [str(tmp_path / f'{i}.zip') for i in range(24)]
+            return await asyncio.gather(*(detector.analyze_file(p) for p in paths))
+
+    results = _run(main())
+    assert all(r['confidence'] == 1.0 and not r['encrypted'] for r in results)
+    assert 0 < len(names) <= 2
+
+
+def test_shutdown_finishes_queued_checks_and_joins():
+    dispatcher = BlockingDispatcher(2)
+    workers = []
+
+    async def main():
+        futures = [dispatcher.submit(time.sleep, 0.02) for _ in range(6)]
+        await asyncio.sleep(0)
+        workers.extend(dispatcher._workers)
+        # Called off the loop so the workers can still post their results #
+        await asyncio.get_running_loop().run_in_executor(None, dispatcher.shutdown)
+        await asyncio.gather(*futures)
+        with pytest.raises(RuntimeError):
+            dispatcher.submit(abs, -1)
+
+    _run(main())
+    assert dispatcher._threads == 0
+    assert len(workers) == 2 and not any(w.is_alive() for w in workers)
+
+
+def test_detector_threads_capped_by_executor(tmp_path):
+    with ThreadPoolExecutor(2) as executor:
+        with PasswordProtectionDetector(executor, max_workers=64) as detector:
+            assert detector._dispatcher._max_threads == 2
+
@@ -0,0 +1,123 @@
+# EncryptionProject/tests/test_entropy_kernel.py #
+
+import math
+import os
+import pickle
+import random
+import subprocess
+import sys
+from collections import Counter
+
+import pytest
+
+from password_detector_package import entropy_kernel
+
+_RNG = random.Random(1234)
+
+SAMPLES = {
+    'random': os.urandom(8192),
+    'random-odd': os.urandom(8191),
+    'random-large': os.urandom(20000),  # Past the c*log2(c) table #
+    'constant': b'\x00' * 8192,
+    'constant-short': b'A' * 100,
+    'low-alphabet': bytes(_RNG.choice(b'ACGT') for _ in range(5001)),
+    'text': b'Lorem ipsum dolor sit amet, consectetur adipiscing elit.\n' * 90,
+    'single': b'\xff',
+    'odd-length': b'\x00\x7f\x80',
+}
+
+
+def _baseline(data):
+    """The original Counter-based formula the backends replaced."""
+    counts = Counter(data)
+    entropy = -sum((c / len(data)) * math.log2(c / len(data)) for c in counts.values() if c > 0)
+    freqs = [counts.get(i, 0) for i in range(256)]
+    mean = sum(freqs) / 256
+    var = sum((f - mean) ** 2 for f in freqs) / 256
+    skew = sum(((f - mean) / (math.sqrt(var) + 1e-8)) ** 3 for f in freqs) / 256
+    return (
+        entropy,
+        skew,
+        data.count(0x00) / len(data),
+        sum(32 <= b <= 126 for b in data) / len(data),
+        sum(b > 127 for b in data) / len(data),
+    )
+
+
+def _numpy(data):
+    np = pytest.importorskip('numpy')
+    return entropy_kernel._entropy_stats_numpy(np.frombuffer(data, dtype=np.uint8))
+
+
+def _shannon(data):
+    if not entropy_kernel.SHANNON_AVAILABLE:
+        pytest.skip('_shannon C extension not built')
+    return entropy_kernel.shannon_stats(data)
+
+
+BACKENDS = {
+    'python': entropy_kernel._entropy_stats_python,
+    'numpy': _numpy,
+    'c': _shannon,
+}
+
+
+def _assert_stats_equal(got, want):
+    assert len(got) == 5
+    for g, w in zip(got, want):
+        assert g == pytest.approx(w, rel=1e-9, abs=1e-9)
+
+
+@pytest.mark.parametrize('backend', list(BACKENDS))
+@pytest.mark.parametrize('sample', list(SAMPLES))
+def test_backend_matches_baseline(backend, sample):
+    data = SAMPLES[sample]
+    _assert_stats_equal(BACKENDS[backend](data), _baseline(data))
+
+
+@pytest.mark.parametrize('sample', list(SAMPLES))
+def test_dispatch_matches_baseline(sample):
+    data = SAMPLES[sample]
+    _assert_stats_equal(entropy_kernel.entropy_stats(data), _baseline(data))
+    _assert_stats_equal(entropy_kernel.entropy_stats(bytearray(data)), _baseline(data))
+
+
+@pytest.fixture(scope='module')
+def numba_stats():
+    """Numba kernel results for SAMPLES, computed in a subprocess where the C kernel is hidden."""
+    pytest.importorskip('numba')
+    # Numba is only used without the C extension. A fresh interpreter imports the real #
+    # module, so its on-disk JIT cache stays valid for normal imports #
+    script = (
+        "import pickle, sys\n"
+        "sys.modules['password_detector_package._shannon'] = None\n"
+        "import numpy as np\n"
+        "from password_detector_package import entropy_kernel\n"
+        "assert entropy_kernel.NUMBA_AVAILABLE\n"
+        "samples = pickle.load(sys.stdin.buffer)\n"
+        "pickle.dump({name: tuple(map(float, entropy_kernel._entropy_stats(np.frombuffer(data, dtype=np.uint8))))\n"
+        "             for name, data in samples.items()}, sys.stdout.buffer)\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get('PYTHONPATH')])))
+    proc = subprocess.run([sys.executable, '-c', script], input=pickle.dumps(SAMPLES),
+                          capture_output=True, env=env, check=True)
+    return pickle.loads(proc.stdout)
+
+
+@pytest.mark.parametrize('sample', list(SAMPLES))
+def test_numba_matches_baseline(numba_stats, sample):
+    _assert_stats_equal(numba_stats[sample], _baseline(SAMPLES[sample]))
+
+
+@pytest.mark.parametrize('with_large', [False, True])
+def test_batched_numpy_matches_baseline(monkeypatch, with_large):
+    pytest.importorskip('numpy')
+    # Force the batched bincount pass that only runs without a compiled kernel #
+    monkeypatch.setattr(entropy_kernel, 'SHANNON_AVAILABLE', False)
+    monkeypatch.setattr(entropy_kernel, 'NUMBA_AVAILABLE', False)
+    names = [name for name in SAMPLES if with_large or len(SAMPLES[name]) <= 8192]
+    stats = entropy_kernel.entropy_stats_many([SAMPLES[name] for name in names])
+    assert len(stats) == len(names)
+    for name, row in zip(names, stats):
+        _assert_stats_equal(row, _baseline(SAMPLES[name]))
@@ -0,0 +1,49 @@
+# EncryptionProject/tests/test_file_handlers.py #
+
+import asyncio
+import os
+import sqlite3
+
+import pytest
+
+from password_detector_package.file_handlers import SQLiteHandler, _sqlite_header_verdict
+
+
+def _sqlite_db(path):
+    conn = sqlite3.connect(str(path))
+    conn.execute('CREATE TABLE t (x TEXT)')
+    conn.executemany('INSERT INTO t VALUES (?)', [('row',)] * 100)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_real_database_is_not_protected(tmp_path):
+    path = _sqlite_db(tmp_path / 'plain.db')
+    assert _sqlite_header_verdict(path.read_bytes()[:8192]) == (False, False, 1.0)
+    # Without a prefix the handler reads the first page itself #
+    assert asyncio.run(SQLiteHandler.is_encrypted(str(path))) == (False, False, 1.0)
+
+
+@pytest.mark.parametrize('size', [1024, 4096, 8192])
+def test_random_first_page_is_encrypted(tmp_path, size):
+    data = os.urandom(size)
+    assert _sqlite_header_verdict(data) == (True, True, 0.9)
+    path = tmp_path / 'cipher.db'
+    path.write_bytes(data)
+    assert asyncio.run(SQLiteHandler.is_encrypted(str(path))) == (True, True, 0.9)
+
+
+@pytest.mark.parametrize('data', [
+    b'SQLite format 3\x00\x12',          # Truncated header #
+    os.urandom(100),                     # Shorter than any database page #
+    b'\x00' * 4096,                      # Zero-filled #
+    b'key=value\n' * 400,                # Text under a .db name #
+    b'SQLite format 3\x00\x03\x00' + os.urandom(4078),  # Magic with an invalid page size #
+], ids=['truncated', 'short', 'zeros', 'text', 'bad-page-size'])
+def test_other_content_is_left_to_entropy(data):
+    assert _sqlite_header_verdict(data) == (False, False, 0.0)
+
+
+def test_empty_file_is_an_empty_database():
+    assert _sqlite_header_verdict(b'') == (False, False, 1.0)
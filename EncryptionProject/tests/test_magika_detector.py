@@ -0,0 +1,45 @@
+# EncryptionProject/tests/test_magika_detector.py #
+
+import asyncio
+import os
+import zipfile
+
+import pytest
+
+magika = pytest.importorskip('magika')
+pytest.importorskip('onnxruntime')
+
+from password_detector_package import magika_detector
+
+
+def test_cached_session_hook_is_used(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    calls = []
+    cached_session = magika_detector._cached_session
+
+    def recording_cached_session(rt, model_path):
+        calls.append(model_path)
+        return cached_session(rt, model_path)
+
+    monkeypatch.setattr(magika_detector, '_cached_session', recording_cached_session)
+
+    # The private hook must still exist in the installed Magika, or caching is silently off #
+    cls = magika_detector._magika_class()
+    assert cls is not magika.Magika
+    cls()
+    assert calls and calls[0].endswith('model.onnx')
+    saved = os.listdir(tmp_path / 'password_detector')
+    assert any(name.endswith('.opt.onnx') for name in saved)
+
+    # A second model loads the saved graph instead of optimizing again #
+    cls()
+    assert len(calls) == 2
+    assert os.listdir(tmp_path / 'password_detector') == saved
+
+
+def test_detect_maps_to_internal_tags(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    path = tmp_path / 'archive.bin'
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.writestr('a.txt', 'hello ' * 200)
+    assert asyncio.run(magika_detector.MagikaDetector().detect(str(path))) == 'zip'
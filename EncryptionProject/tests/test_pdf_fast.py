@@ -0,0 +1,143 @@
+# EncryptionProject/tests/test_pdf_fast.py #
+
+import re
+
+import pytest
+
+from password_detector_package.pdf_fast import pdf_encryption_flag
+from password_detector_package.file_handlers import _check_pdf_blocking
+
+pikepdf = pytest.importorskip('pikepdf')
+
+# Fixtures are written by pikepdf (qpdf) and judged against pikepdf's own answer #
+
+_VARIANTS = {
+    'plain': {},
+    'rc4': {'encryption': ('u', 'o', 3, False)},
+    'aes128': {'encryption': ('u', 'o', 4, True)},
+    'aes256': {'encryption': ('u', 'o', 6, True)},
+    'owner_only': {'encryption': ('', 'o', 4, True)},
+}
+
+
+def _write_pdf(path, encryption=None, linearize=False, object_streams=False):
+    pdf = pikepdf.new()
+    pdf.add_blank_page()
+    kwargs = {'linearize': linearize}
+    if object_streams:
+        # Cross-reference streams instead of a classic table and trailer #
+        kwargs['object_stream_mode'] = pikepdf.ObjectStreamMode.generate
+    if encryption is not None:
+        user, owner, revision, aes = encryption
+        kwargs['encryption'] = pikepdf.Encryption(user=user, owner=owner, R=revision, aes=aes,
+                                                  metadata=revision >= 4)
+    pdf.save(path, **kwargs)
+    return path
+
+
+def _library_says_encrypted(path):
+    try:
+        with pikepdf.open(path) as pdf:
+            return pdf.is_encrypted
+    except pikepdf.PasswordError:
+        return True
+
+
+def _append_update(path, keep_encrypt=True):
+    """Append an incremental update section whose trailer chains to the original via /Prev."""
+    data = path.read_bytes()
+    prev = int(re.findall(rb'startxref\s+(\d+)', data)[-1])
+    trailers = re.findall(rb'trailer\s*<<(.*?)>>\s*startxref', data, re.S)
+    root = re.search(rb'/Root\s+\d+\s+\d+\s+R', trailers[-1]).group(0)
+    size = int(re.search(rb'/Size\s+(\d+)', trailers[-1]).group(1))
+    encrypt = re.search(rb'/Encrypt\s+\d+\s+\d+\s+R', trailers[-1])
+    body = b'\n%d 0 obj\n<< /Producer (update) >>\nendobj\n' % size
+    offset = len(data) + 1
+    xref_offset = len(data) + len(body)
+    entries = (b'xref\n0 1\n0000000000 65535 f \n%d 1\n%010d 00000 n \n' % (size, offset))
+    extra = b' ' + encrypt.group(0) if encrypt is not None and keep_encrypt else b''
+    trailer = (b'trailer\n<< /Size %d %s /Prev %d%s >>\nstartxref\n%d\n%%%%EOF\n'
+               % (size + 1, root, prev, extra, xref_offset))
+    path.write_bytes(data + body + entries + trailer)
+    return path
+
+
+@pytest.mark.parametrize('linearize', [False, True], ids=['flat', 'linearized'])
+@pytest.mark.parametrize('object_streams', [False, True], ids=['table', 'xref_stream'])
+@pytest.mark.parametrize('variant', sorted(_VARIANTS))
+def test_matches_library(tmp_path, variant, object_streams, linearize):
+    path = _write_pdf(tmp_path / 'doc.pdf', linearize=linearize, object_streams=object_streams,
+                      **_VARIANTS[variant])
+    flag = pdf_encryption_flag(str(path))
+    expected = _library_says_encrypted(str(path))
+    if expected:
+        # Encrypted files must never settle as plain; True or "ask the library" are both safe #
+        assert flag is not False
+    else:
+        assert flag in (False, None)
+    if not linearize:
+        # A single section is always conclusive #
+        assert flag is expected
+
+
+def test_linearized_encrypted_is_not_settled_as_plain(tmp_path):
+    # The newest section of a linearized file is the first-page one at the start; #
+    # the trailer in the last 4 KiB belongs to the main section and has no /Encrypt #
+    path = _write_pdf(tmp_path / 'lin.pdf', encryption=('u', 'o', 3, False), linearize=True)
+    assert pdf_encryption_flag(str(path)) is True
+    assert _check_pdf_blocking(str(path)) == (True, True, 1.0)
+
+
+def test_linearized_plain_is_left_to_library(tmp_path):
+    path = _write_pdf(tmp_path / 'lin.pdf', linearize=True)
+    assert pdf_encryption_flag(str(path)) is None
+
+
+@pytest.mark.parametrize('variant', ['plain', 'rc4'])
+def test_incremental_update(tmp_path, variant):
+    path = _append_update(_write_pdf(tmp_path / 'doc.pdf', **_VARIANTS[variant]))
+    expected = _library_says_encrypted(str(path))
+    assert expected is (variant != 'plain')
+    # /Prev chains to an older section: only /Encrypt in the newest trailer is conclusive #
+    assert pdf_encryption_flag(str(path)) is (True if expected else None)
+
+
+def test_update_dropping_encrypt_is_left_to_library(tmp_path):
+    # A non-conforming update whose trailer omits /Encrypt must not hide the older one #
+    path = _append_update(_write_pdf(tmp_path / 'doc.pdf', **_VARIANTS['rc4']), keep_encrypt=False)
+    assert pdf_encryption_flag(str(path)) is None
+
+
+@pytest.mark.parametrize('variant', ['plain', 'rc4'])
+@pytest.mark.parametrize('keep', [0.25, 0.5, 0.9])
+def test_truncated(tmp_path, variant, keep):
+    path = _write_pdf(tmp_path / 'doc.pdf', **_VARIANTS[variant])
+    data = path.read_bytes()
+    path.write_bytes(data[:int(len(data) * keep)])
+    # The trailer is gone, so nothing can be settled from it #
+    assert pdf_encryption_flag(str(path)) is None
+
+
+def test_prepended_data_is_left_to_library(tmp_path):
+    path = _write_pdf(tmp_path / 'doc.pdf', **_VARIANTS['rc4'])
+    path.write_bytes(b'\0' * 1000 + path.read_bytes())
+    assert pdf_encryption_flag(str(path)) is not False
+
+
+@pytest.mark.parametrize('data', [
+    b'',
+    b'%PDF-1.7\n',
+    b'%PDF-1.4\nstartxref\n999999\n%%EOF\n',
+    b'%PDF-1.4\nxref\n0 1\n0000000000 65535 f \nstartxref\n9\n%%EOF\n',
+    b'%PDF-1.4\nxref\n0 zz\ntrailer << /Size 1 >>\nstartxref\n9\n%%EOF\n',
+], ids=['empty', 'header_only', 'offset_past_end', 'no_trailer', 'bad_subsection'])
+def test_malformed(tmp_path, data):
+    path = tmp_path / 'bad.pdf'
+    path.write_bytes(data)
+    assert pdf_encryption_flag(str(path)) is None
+
+
+def test_open_file_object(tmp_path):
+    path = _write_pdf(tmp_path / 'doc.pdf', **_VARIANTS['aes256'])
+    with open(path, 'rb') as f:
+        assert pdf_encryption_flag(f) is True
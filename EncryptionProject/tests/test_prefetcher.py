@@ -0,0 +1,83 @@
+# EncryptionProject/tests/test_prefetcher.py #
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from password_detector_package.prefetcher import aprefetch, prefetch
+
+
+def _slow_items(count, delay, walked=None):
+    for i in range(count):
+        time.sleep(delay)
+        if walked is not None:
+            walked.append(i)
+        yield (f'/nonexistent/{i}', None)
+
+
+async def _tick(ticks, stop):
+    while not stop.is_set():
+        ticks[0] += 1
+        await asyncio.sleep(0.005)
+
+
+def test_items_in_order():
+    items = [(f'/nonexistent/{i}', None) for i in range(200)]
+
+    async def main():
+        return [item async for item in aprefetch(iter(items), depth=4)]
+
+    assert asyncio.run(main()) == items
+    assert list(prefetch(iter(items), depth=4)) == items
+
+
+def test_walk_error_reaches_consumer():
+    def failing():
+        yield ('/nonexistent/a', None)
+        raise OSError('walk failed')
+
+    async def main():
+        return [item async for item in aprefetch(failing())]
+
+    with pytest.raises(OSError, match='walk failed'):
+        asyncio.run(main())
+
+
+def test_slow_walk_leaves_loop_responsive():
+    ticks = [0]
+
+    async def main():
+        stop = asyncio.Event()
+        ticker = asyncio.ensure_future(_tick(ticks, stop))
+        items = [item async for item in aprefetch(_slow_items(5, 0.05))]
+        stop.set()
+        await ticker
+        return items
+
+    assert len(asyncio.run(main())) == 5
+    # A walk blocking the loop would let the ticker run only between items #
+    assert ticks[0] >= 20
+
+
+def test_early_stop_does_not_block_loop():
+    ticks, walked = [0], []
+
+    async def main():
+        stop = asyncio.Event()
+        walk = aprefetch(_slow_items(1000, 0.05, walked))
+        assert (await walk.__anext__())[0] == '/nonexistent/0'
+        ticker = asyncio.ensure_future(_tick(ticks, stop))
+        before = ticks[0]
+        await walk.aclose()
+        stop.set()
+        await ticker
+        return ticks[0] - before
+
+    assert asyncio.run(main()) >= 1
+    # The walker stopped soon after the consumer did #
+    count = len(walked)
+    time.sleep(0.2)
+    assert len(walked) == count < 1000
+    assert not any(t.name == 'prefetcher' for t in threading.enumerate())
@@ -0,0 +1,131 @@
+# EncryptionProject/tests/test_rar_fast.py #
+
+import io
+import struct
+import zlib
+
+import pytest
+
+from password_detector_package.rar_fast import rar_encryption_flag
+
+rarfile = pytest.importorskip('rarfile')
+
+# No RAR writer is freely available, so fixtures are assembled block by block #
+# (stored entries, no compression) and judged against rarfile's own answer #
+
+_FILES = [(b'a.txt', b'hello ' * 20), (b'dir/b.txt', b'world')]
+
+
+def _vint(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if not value:
+            out.append(byte)
+            return bytes(out)
+        out.append(byte | 0x80)
+
+
+def _rar5_block(block_type, fields=b'', extra=b'', data=b''):
+    flags = (0x01 if extra else 0) | (0x02 if data else 0)
+    body = _vint(block_type) + _vint(flags)
+    if extra:
+        body += _vint(len(extra))
+    if data:
+        body += _vint(len(data))
+    header = _vint(len(body) + len(fields) + len(extra)) + body + fields + extra
+    return struct.pack('<L', zlib.crc32(header)) + header + data
+
+
+def _rar5(encrypted=(), header_encrypted=False, end=True):
+    out = b'Rar!\x1a\x07\x01\x00'
+    if header_encrypted:
+        # Crypt header (version, flags, KDF count, salt); everything after it is ciphertext #
+        out += _rar5_block(4, _vint(0) + _vint(0) + bytes([15]) + b'S' * 16)
+        return out + bytes(range(64))
+    out += _rar5_block(1, _vint(0))
+    for index, (name, data) in enumerate(_FILES):
+        fields = (_vint(0x04) + _vint(len(data)) + _vint(0x20) + struct.pack('<L', zlib.crc32(data))
+                  + _vint(0) + _vint(0) + _vint(len(name)) + name)
+        extra = b''
+        if index in encrypted:
+            record = _vint(0x01) + _vint(0) + _vint(0) + bytes([15]) + b'S' * 16 + b'I' * 16
+            extra = _vint(len(record)) + record
+        out += _rar5_block(2, fields, extra, data)
+    if end:
+        out += _rar5_block(5, _vint(0))
+    return out
+
+
+def _rar4_block(block_type, flags, fields=b'', data=b''):
+    header = struct.pack('<BHH', block_type, flags, 7 + len(fields)) + fields
+    return struct.pack('<H', zlib.crc32(header) & 0xFFFF) + header + data
+
+
+def _rar4(encrypted=(), header_encrypted=False, end=True):
+    out = b'Rar!\x1a\x07\x00'
+    out += _rar4_block(0x73, 0x0080 if header_encrypted else 0, b'\0' * 6)
+    if header_encrypted:
+        return out + bytes(range(64))
+    for index, (name, data) in enumerate(_FILES):
+        fields = struct.pack('<LLBLLBBHL', len(data), len(data), 2, zlib.crc32(data),
+                             0x5A210000, 29, 0x30, len(name), 0x20) + name
+        flags = 0x8000 | (0x04 if index in encrypted else 0)
+        out += _rar4_block(0x74, flags, fields, data)
+    if end:
+        out += _rar4_block(0x7B, 0x4000)
+    return out
+
+
+_VARIANTS = {
+    'plain': {},
+    'password': {'encrypted': (0, 1)},
+    'password_second_entry': {'encrypted': (1,)},
+    'header_encrypted': {'header_encrypted': True},
+    'no_end_block': {'end': False},
+}
+_BUILDERS = {'rar5': _rar5, 'rar4': _rar4}
+
+
+def _library_says_encrypted(path):
+    with rarfile.RarFile(path) as archive:
+        return archive.needs_password()
+
+
+@pytest.mark.parametrize('variant', sorted(_VARIANTS))
+@pytest.mark.parametrize('version', sorted(_BUILDERS))
+def test_matches_library(tmp_path, version, variant):
+    path = tmp_path / 'archive.rar'
+    path.write_bytes(_BUILDERS[version](**_VARIANTS[variant]))
+    assert rar_encryption_flag(str(path)) is _library_says_encrypted(str(path))
+
+
+@pytest.mark.parametrize('version', sorted(_BUILDERS))
+def test_entries_are_readable(tmp_path, version):
+    # Guards the fixtures themselves: rarfile must see every stored entry #
+    path = tmp_path / 'archive.rar'
+    path.write_bytes(_BUILDERS[version]())
+    with rarfile.RarFile(str(path)) as archive:
+        assert [archive.read(name.decode()) for name, _ in _FILES] == [data for _, data in _FILES]
+
+
+@pytest.mark.parametrize('variant', ['plain', 'password_second_entry'])
+@pytest.mark.parametrize('version', sorted(_BUILDERS))
+def test_truncated_never_settles_plain(version, variant):
+    data = _BUILDERS[version](**_VARIANTS[variant])
+    for cut in (len(data) - 3, len(data) // 2, 12, 7, 0):
+        # A cut through the entries may hide an encrypted one further on #
+        assert rar_encryption_flag(io.BytesIO(data[:cut])) is not False
+
+
+# The main header's CRC follows the signature #
+@pytest.mark.parametrize('version, offset', [('rar5', 8), ('rar4', 7)])
+def test_bad_header_crc_is_inconclusive(version, offset):
+    data = bytearray(_BUILDERS[version]())
+    data[offset] ^= 0xFF
+    assert rar_encryption_flag(io.BytesIO(bytes(data))) is None
+
+
+def test_not_a_rar_file():
+    assert rar_encryption_flag(io.BytesIO(b'7z\xbc\xaf\x27\x1c' + b'\0' * 64)) is None
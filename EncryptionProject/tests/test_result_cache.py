@@ -0,0 +1,79 @@
+# EncryptionProject/tests/test_result_cache.py #
+
+import asyncio
+import os
+import sqlite3
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from password_detector_package import detector as detector_module
+from password_detector_package.detector import PasswordProtectionDetector
+from password_detector_package.file_handlers import _unavailable
+from password_detector_package.result_cache import RESULT_SCHEMA_VERSION, ResultStore
+
+
+def _analyze(path, store, patch_handlers=None):
+    async def main():
+        with ThreadPoolExecutor(2) as executor:
+            detector = PasswordProtectionDetector(executor, result_store=store)
+            if patch_handlers:
+                detector.handlers.update(patch_handlers)
+            return await detector.analyze_file(path)
+
+    return asyncio.run(main())
+
+
+def test_round_trip(tmp_path):
+    db = str(tmp_path / 'results.sqlite3')
+    with ResultStore(db) as store:
+        store.put((1, 2, 3, 4, '.zip'), (True, True, 1.0))
+        store.put((1, 2, 3, 5, '.zip'), (False, False, 0.75))
+    with ResultStore(db) as store:
+        assert store.get((1, 2, 3, 4, '.zip')) == (True, True, 1.0)
+        assert store.get((1, 2, 3, 5, '.zip')) == (False, False, 0.75)
+        assert store.get((1, 2, 3, 4, '.pdf')) is None
+
+
+def test_schema_version_change_drops_rows(tmp_path):
+    db = str(tmp_path / 'results.sqlite3')
+    with ResultStore(db) as store:
+        store.put(('key',), (True, True, 1.0))
+    conn = sqlite3.connect(db)
+    conn.execute(f'PRAGMA user_version={RESULT_SCHEMA_VERSION - 1}')
+    conn.commit()
+    conn.close()
+    with ResultStore(db) as store:
+        assert store.get(('key',)) is None
+    conn = sqlite3.connect(db)
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == RESULT_SCHEMA_VERSION
+    conn.close()
+
+
+def test_rename_invalidates_verdict(tmp_path):
+    db = str(tmp_path / 'results.sqlite3')
+    path = tmp_path / 'report.bin'
+    path.write_bytes(os.urandom(16384))
+    with ResultStore(db) as store:
+        assert _analyze(str(path), store)['encrypted']
+
+    # Same inode, size and mtime; only the extension changes the verdict #
+    renamed = tmp_path / 'report.txt'
+    os.rename(path, renamed)
+    with ResultStore(db) as store:
+        result = _analyze(str(renamed), store)
+    assert not result['encrypted'] and result['confidence'] == 0.9
+
+
+def test_verdict_without_library_is_not_stored(tmp_path):
+    db = str(tmp_path / 'results.sqlite3')
+    path = str(tmp_path / 'a.zip')
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.writestr('a.txt', 'x' * 100)
+    with ResultStore(db) as store:
+        _analyze(path, store, {'zip': _unavailable})
+    key = (*detector_module.stat_key(path), '.zip')
+    with ResultStore(db) as store:
+        assert store.get(key) is None
+        assert _analyze(path, store)['confidence'] == 1.0
+    with ResultStore(db) as store:
+        assert store.get(key) is not None
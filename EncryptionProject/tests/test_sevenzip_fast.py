@@ -0,0 +1,80 @@
+# EncryptionProject/tests/test_sevenzip_fast.py #
+
+import io
+
+import pytest
+
+from password_detector_package.sevenzip_fast import sevenzip_encryption_flag
+
+py7zr = pytest.importorskip('py7zr')
+
+# Fixtures are written by py7zr and judged against py7zr's own answer #
+
+_VARIANTS = {
+    'plain': {},
+    'stored': {'filters': [{'id': py7zr.FILTER_COPY}]},
+    'password': {'password': 'pw'},
+    'header_encrypted': {'password': 'pw', 'header_encryption': True},
+}
+
+
+def _write_7z(path, encoded_header=True, files=True, **kwargs):
+    with py7zr.SevenZipFile(path, 'w', **kwargs) as archive:
+        if not encoded_header:
+            archive.set_encoded_header_mode(False)
+        if files:
+            archive.writestr(b'hello ' * 100, 'a.txt')
+            archive.writestr(b'world', 'dir/b.txt')
+    return path
+
+
+def _library_says_encrypted(path):
+    try:
+        with py7zr.SevenZipFile(path) as archive:
+            return archive.needs_password()
+    except py7zr.PasswordRequired:
+        return True  # An encrypted header cannot even be listed #
+
+
+@pytest.mark.parametrize('encoded_header', [True, False], ids=['encoded_header', 'raw_header'])
+@pytest.mark.parametrize('variant', sorted(_VARIANTS))
+def test_matches_library(tmp_path, variant, encoded_header):
+    kwargs = dict(_VARIANTS[variant])
+    if not encoded_header and kwargs.get('header_encryption'):
+        pytest.skip('an encrypted header is always encoded')
+    path = _write_7z(tmp_path / 'archive.7z', encoded_header=encoded_header, **kwargs)
+    assert sevenzip_encryption_flag(str(path)) is _library_says_encrypted(str(path))
+
+
+def test_empty_archive(tmp_path):
+    path = _write_7z(tmp_path / 'empty.7z', files=False)
+    assert _library_says_encrypted(str(path)) is False
+    assert sevenzip_encryption_flag(str(path)) is False
+
+
+@pytest.mark.parametrize('variant', sorted(_VARIANTS))
+def test_truncated_is_inconclusive(tmp_path, variant):
+    data = _write_7z(tmp_path / 'archive.7z', **_VARIANTS[variant]).read_bytes()
+    for cut in (len(data) - 1, 40, 31, 6, 0):
+        assert sevenzip_encryption_flag(io.BytesIO(data[:cut])) is None
+
+
+@pytest.mark.parametrize('offset', [-2, 20, 8], ids=['next_header', 'start_header', 'start_crc'])
+def test_corrupt_header_is_inconclusive(tmp_path, offset):
+    path = _write_7z(tmp_path / 'archive.7z', password='pw')
+    data = bytearray(path.read_bytes())
+    data[offset] ^= 0xFF
+    path.write_bytes(bytes(data))
+    with pytest.raises(py7zr.Bad7zFile):
+        py7zr.SevenZipFile(str(path))
+    assert sevenzip_encryption_flag(str(path)) is None
+
+
+def test_not_a_7z_file():
+    assert sevenzip_encryption_flag(io.BytesIO(b'PK\x03\x04' + b'\0' * 64)) is None
+
+
+def test_file_object_source(tmp_path):
+    for variant, expected in (('plain', False), ('header_encrypted', True)):
+        data = _write_7z(tmp_path / (variant + '.7z'), **_VARIANTS[variant]).read_bytes()
+        assert sevenzip_encryption_flag(io.BytesIO(data)) is expected
@@ -0,0 +1,85 @@
+# EncryptionProject/tests/test_type_utils.py #
+
+import asyncio
+import threading
+import zipfile
+
+import pytest
+
+from password_detector_package import type_utils
+from password_detector_package.cfbf_fast import ole_cache
+from password_detector_package.type_utils import FileTypeDetector, _sniff_file_type
+
+
+def _write_zip(path, members, mimetype=None):
+    with zipfile.ZipFile(path, 'w') as zf:
+        if mimetype is not None:
+            # ODF: an uncompressed mimetype member comes first #
+            zf.writestr('mimetype', mimetype, compress_type=zipfile.ZIP_STORED)
+        for name in members:
+            zf.writestr(name, 'x' * 64, compress_type=zipfile.ZIP_DEFLATED)
+    return str(path)
+
+
+def _header(path):
+    with open(path, 'rb') as f:
+        return f.read(8192)
+
+
+@pytest.mark.parametrize('name', ['archive.docx', 'archive.xlsx', 'archive.pptx', 'archive.odt'])
+def test_plain_zip_under_office_name_is_a_zip(tmp_path, name):
+    path = _write_zip(tmp_path / name, ['a.txt'])
+    # The extension alone must not settle it: the archive checks have to run #
+    assert FileTypeDetector().detect_fast(path, _header(path)) is None
+    assert _sniff_file_type(path) == 'zip'
+
+
+def test_ooxml_package(tmp_path):
+    path = _write_zip(tmp_path / 'doc.docx', ['[Content_Types].xml', 'word/document.xml'])
+    assert _sniff_file_type(path) == 'office_openxml'
+
+
+def test_odf_package_is_settled_from_the_header(tmp_path):
+    path = _write_zip(tmp_path / 'doc.odt', ['content.xml'],
+                      mimetype='application/vnd.oasis.opendocument.text')
+    assert FileTypeDetector().detect_fast(path, _header(path)) == 'libre_office'
+
+
+def test_zip_directory_is_read_off_the_loop(tmp_path, monkeypatch):
+    path = _write_zip(tmp_path / 'app.jar', ['META-INF/MANIFEST.MF'])
+    threads = []
+    find_entries = type_utils.find_entries
+
+    def recording_find_entries(*args):
+        threads.append(threading.current_thread())
+        return find_entries(*args)
+
+    monkeypatch.setattr(type_utils, 'find_entries', recording_find_entries)
+    file_type = asyncio.run(FileTypeDetector().detect(path, header=_header(path)))
+    assert file_type == 'zip'
+    assert threads and threading.main_thread() not in threads
+
+
+def test_ole_directory_is_read_off_the_loop(tmp_path, monkeypatch):
+    path = tmp_path / 'mail.bin'
+    path.write_bytes(b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1' + b'\x00' * 504)
+    threads = []
+
+    def recording_root_entry_names(file_path):
+        threads.append(threading.current_thread())
+        names = ole_cache.get()[file_path] = frozenset(('__properties_version1.0',))
+        return names
+
+    monkeypatch.setattr(type_utils, 'cached_root_entry_names', recording_root_entry_names)
+
+    async def main():
+        cache = {}
+        ole_cache.set(cache)
+        file_type = await FileTypeDetector().detect(str(path), header=_header(path))
+        return file_type, cache
+
+    file_type, cache = asyncio.run(main())
+    assert file_type == 'msg'
+    assert threads and threading.main_thread() not in threads
+    # The worker thread filled this analysis' cache, so the OLE handler reuses the read #
+    assert str(path) in cache
@@ -0,0 +1,218 @@
+# EncryptionProject/tests/test_zip_fast.py #
+
+import io
+import zipfile
+
+import pytest
+
+from password_detector_package import zip_fast
+from password_detector_package.zip_fast import (
+    find_entries, find_entry_records, read_central_directory, read_entry, zip_encryption_flag,
+)
+
+# Fixtures are written by zipfile and every answer is judged against zipfile's own reading #
+
+_FILES = [('a.txt', b'hello ' * 200), ('dir/b.bin', bytes(range(256)) * 4), ('c.txt', b'')]
+
+
+def _build(comment=b'', prefix=b''):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for name, data in _FILES:
+            zf.writestr(name, data)
+        zf.comment = comment
+    return prefix + buf.getvalue()
+
+
+def _encrypt(data, name):
+    # zipfile cannot write encrypted members, so set the bit in both headers of one entry #
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        offset = zf.getinfo(name).header_offset
+    data = bytearray(data)
+    data[offset + 6] |= 1
+    central = data.index(b'PK\x01\x02')
+    while data[central + 46:central + 46 + len(name)] != name.encode():
+        central = data.index(b'PK\x01\x02', central + 1)
+    data[central + 8] |= 1
+    return bytes(data)
+
+
+def _expected(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        return {info.filename.encode(): info.flag_bits for info in zf.infolist()}
+
+
+@pytest.fixture(params=['c', 'python'])
+def flag_walk(request, monkeypatch):
+    """Run zip_encryption_flag through the C extension and through the Python loop."""
+    if request.param == 'c':
+        if not zip_fast.ZIPSCAN_AVAILABLE:
+            pytest.skip('_zipscan extension not built')
+    else:
+        monkeypatch.setattr(zip_fast, 'ZIPSCAN_AVAILABLE', False)
+    return zip_encryption_flag
+
+
+@pytest.mark.parametrize('comment', [b'', b'plain comment', b'PK\x05\x06' + b'\x00' * 40, b'x' * 0xFFFF],
+                         ids=['none', 'text', 'fake-eocd', 'max-length'])
+def test_trailing_comment_matches_zipfile(comment, flag_walk):
+    data = _build(comment)
+    expected = _expected(data)
+    assert find_entries(io.BytesIO(data), expected) == expected
+    assert flag_walk(io.BytesIO(data)) is False
+
+
+def test_prepended_data_matches_zipfile(flag_walk):
+    # Self-extracting stubs shift every recorded offset #
+    data = _build(prefix=b'MZ' + b'\x90' * 1000)
+    expected = _expected(data)
+    assert find_entries(io.BytesIO(data), expected) == expected
+    assert flag_walk(io.BytesIO(data)) is False
+
+
+@pytest.mark.parametrize('name', [name for name, _ in _FILES])
+def test_encrypted_member_matches_zipfile(name, flag_walk):
+    data = _encrypt(_build(b'comment'), name)
+    expected = _expected(data)
+    assert expected[name.encode()] & 0x1
+    assert find_entries(io.BytesIO(data), expected) == expected
+    assert flag_walk(io.BytesIO(data)) is True
+
+
+def test_path_and_file_object_agree(tmp_path, flag_walk):
+    path = tmp_path / 'enc.zip'
+    path.write_bytes(_encrypt(_build(), 'dir/b.bin'))
+    assert read_central_directory(str(path)) == read_central_directory(io.BytesIO(path.read_bytes()))
+    assert flag_walk(str(path)) is True
+
+
+def _corrupt_signature(data):
+    pos = data.rindex(b'PK\x05\x06')
+    return data[:pos] + b'PK\x00\x00' + data[pos + 4:]
+
+
+def _corrupt_offset(data):
+    # A directory size larger than everything in front of the EOCD #
+    pos = data.rindex(b'PK\x05\x06')
+    return data[:pos + 12] + b'\xff\xff\xff\x7f' + data[pos + 16:]
+
+
+def _corrupt_directory(data):
+    # EOCD intact, but the directory it points at is not a central directory header #
+    pos = data.index(b'PK\x01\x02')
+    return data[:pos] + b'XX' + data[pos + 2:]
+
+
+@pytest.mark.parametrize('corrupt', [
+    lambda data: data[:-10], _corrupt_signature, _corrupt_offset, _corrupt_directory, lambda data: b'',
+], ids=['truncated', 'signature', 'size', 'directory', 'empty'])
+def test_corrupt_eocd_returns_none(corrupt, flag_walk):
+    data = corrupt(_build())
+    with pytest.raises(zipfile.BadZipFile):
+        zipfile.ZipFile(io.BytesIO(data)).testzip()
+    assert read_central_directory(io.BytesIO(data)) is None
+    assert flag_walk(io.BytesIO(data)) is None
+    assert find_entries(io.BytesIO(data), [b'a.txt']) is None
+
+
+def test_missing_file_returns_none(tmp_path):
+    assert read_central_directory(str(tmp_path / 'missing.zip')) is None
+
+
+# --- ZIP64 --- #
+
+def _build_zip64(force_markers=False):
+    # zipfile adds the ZIP64 end records once the entry count passes this limit; the #
+    # classic EOCD then still holds the real values unless they overflow #
+    buf = io.BytesIO()
+    limit = zipfile.ZIP_FILECOUNT_LIMIT
+    zipfile.ZIP_FILECOUNT_LIMIT = 1
+    try:
+        with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for name, data in _FILES:
+                zf.writestr(name, data)
+            zf.comment = b'zip64'
+    finally:
+        zipfile.ZIP_FILECOUNT_LIMIT = limit
+    data = buf.getvalue()
+    assert b'PK\x06\x06' in data and b'PK\x06\x07' in data
+    if force_markers:
+        # What writers emit once the counts or offsets really overflow #
+        pos = data.rindex(b'PK\x05\x06')
+        data = data[:pos + 8] + b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff' + data[pos + 20:]
+    return data
+
+
+@pytest.mark.parametrize('force_markers', [False, True], ids=['locator-only', 'overflow-markers'])
+@pytest.mark.parametrize('prefix', [b'', b'\x00' * 512], ids=['plain', 'prepended'])
+def test_zip64_matches_zipfile(force_markers, prefix, flag_walk):
+    data = prefix + _build_zip64(force_markers)
+    expected = _expected(data)
+    assert find_entries(io.BytesIO(data), expected) == expected
+    assert flag_walk(io.BytesIO(data)) is False
+    encrypted = _encrypt(data, 'c.txt')
+    assert _expected(encrypted)[b'c.txt'] & 0x1
+    assert flag_walk(io.BytesIO(encrypted)) is True
+
+
+def test_zip64_with_missing_record_returns_none(flag_walk):
+    data = _build_zip64(force_markers=True)
+    pos = data.rindex(b'PK\x06\x06')
+    data = data[:pos] + b'PK\x00\x00' + data[pos + 4:]
+    assert read_central_directory(io.BytesIO(data)) is None
+    assert flag_walk(io.BytesIO(data)) is None
+
+
+# --- read_entry --- #
+
+def _entry_archive(compression):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w', compression) as zf:
+        for name, data in _FILES:
+            zf.writestr(name, data)
+        zf.writestr('bomb.xml', b'\x00' * 1000000)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize('compression', [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED], ids=['stored', 'deflated'])
+def test_read_entry_matches_zipfile(compression):
+    data = _entry_archive(compression)
+    f = io.BytesIO(b'\x90' * 100 + data)
+    names = [name.encode() for name, _ in _FILES]
+    records = find_entry_records(f, names + [b'missing'])
+    assert sorted(records) == sorted(names)
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        for name in names:
+            assert read_entry(f, records[name], 1 << 20) == zf.read(name.decode())
+
+
+@pytest.mark.parametrize('compression', [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED], ids=['stored', 'deflated'])
+def test_read_entry_stops_at_max_size(compression):
+    f = io.BytesIO(_entry_archive(compression))
+    record = find_entry_records(f, [b'bomb.xml'])[b'bomb.xml']
+    if compression == zipfile.ZIP_DEFLATED:
+        # Compresses to about a kilobyte, so only the decompression limit can stop it #
+        assert record[2] < 4096
+    assert read_entry(f, record, 4096) is None
+    assert read_entry(f, record, 1000000) == b'\x00' * 1000000
+
+
+def test_read_entry_refuses_encrypted_and_zip64_entries():
+    data = _encrypt(_entry_archive(zipfile.ZIP_DEFLATED), 'a.txt')
+    f = io.BytesIO(data)
+    records = find_entry_records(f, [b'a.txt', b'c.txt'])
+    assert read_entry(f, records[b'a.txt'], 1 << 20) is None
+    flags, method, compressed_size, _ = records[b'c.txt']
+    assert read_entry(f, (flags, method, compressed_size, -1), 1 << 20) is None
+
+
+def test_read_entry_rejects_damaged_data():
+    data = bytearray(_entry_archive(zipfile.ZIP_DEFLATED))
+    f = io.BytesIO(bytes(data))
+    record = find_entry_records(f, [b'a.txt'])[b'a.txt']
+    header_offset = record[3]
+    # Wrong local header signature #
+    data[header_offset] = 0
+    assert read_entry(io.BytesIO(bytes(data)), record, 1 << 20) is None
+    # Deflate stream cut short #
+    assert read_entry(f, (record[0], record[1], record[2] - 4, header_offset), 1 << 20) is None